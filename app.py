@@ -7,8 +7,7 @@ from backend.models.audio_tts_old import speak_text
 
 
 import torch
-import soundfile as sf
-import librosa
+from backend.audio_ingest import TARGET_SAMPLE_RATE, load_audio
 from transformers import WhisperProcessor, WhisperForConditionalGeneration
 
 
@@ -109,22 +108,11 @@ if st.session_state.started and not flag:
             # 1. Read audio bytes into waveform
             audio_bytes = audio_file.read()
 
-            # Save to temp wav (simplest reliable way)
-            with open("temp.wav", "wb") as f:
-                f.write(audio_bytes)
+            # 2. Decode in memory to mono 16 kHz float32 (no temp file)
+            waveform = load_audio(audio_bytes)
 
-            # 2. Load waveform properly
-            waveform, sample_rate = sf.read("temp.wav")
 
-            # Convert stereo → mono
-            if len(waveform.shape) > 1:
-                waveform = waveform.mean(axis=1)
-
-            
-            waveform = librosa.resample(waveform, orig_sr=sample_rate, target_sr=16000)
-
-
-            inputs = processor(waveform, sampling_rate=16000, return_tensors="pt")
+            inputs = processor(waveform, sampling_rate=TARGET_SAMPLE_RATE, return_tensors="pt")
 
             with torch.no_grad():
                 predicted_ids = model.generate(inputs.input_features)
@@ -1,21 +1,15 @@
-import speech_recognition as sr
-from pydub import AudioSegment
-import tempfile
+from backend.audio_ingest import load_audio
+from backend.models.stt_engine import GoogleRecognizerEngine
+
+_recognizer = GoogleRecognizerEngine()
+
 
 def transcribe_audio(audio_bytes) -> str:
     """
-    Transcribe audio bytes to text.
+    Transcribe audio bytes (or a file-like object) to text with the legacy
+    Google recognizer. Decoding and resampling go through the shared ingest
+    path (backend/audio_ingest.py), like every other engine; set
+    STT_ENGINE=google to use this recognizer for voice answers in the app.
     """
-    recognizer = sr.Recognizer()
-
-    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
-        audio = AudioSegment.from_file(audio_bytes)
-        audio.export(tmp.name, format="wav")
-
-        with sr.AudioFile(tmp.name) as source:
-            audio_data = recognizer.record(source)
-
-        try:
-            return recognizer.recognize_google(audio_data)
-        except sr.UnknownValueError:
-            return ""
+    data = audio_bytes.read() if hasattr(audio_bytes, "read") else audio_bytes
+    return _recognizer.transcribe(load_audio(data))
@@ -0,0 +1,148 @@
+import io
+import os
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from backend.metrics import registry
+
+# Whisper (and every other STT model here) expects 16 kHz mono float32
+TARGET_SAMPLE_RATE = 16000
+
+# Energy-based voice activity detection applied before transcription
+VAD_ENABLED = os.getenv("STT_VAD", "1") == "1"
+# Pauses inside an answer longer than this are shortened to it (0 keeps them)
+VAD_MAX_PAUSE_SECONDS = float(os.getenv("STT_MAX_PAUSE_SECONDS", "0"))
+VAD_FRAME_SECONDS = 0.03
+# A frame is speech if it is within this many dB of the loudest frame...
+VAD_RELATIVE_DB = 35.0
+# ...and above this absolute level (dBFS), so near-silent clips stay silent
+VAD_FLOOR_DB = -55.0
+# Audio kept on either side of detected speech, so soft onsets aren't clipped
+VAD_PADDING_SECONDS = 0.2
+
+
+def decode_audio(data: bytes):
+    """
+    Decodes an uploaded recording (WAV, FLAC, OGG, ...) straight from memory.
+    Formats libsndfile can't read (WebM, Ogg Opus on older builds, M4A/AAC)
+    fall back to pydub, which decodes them with ffmpeg.
+    Returns (float32 array of shape [frames, channels], sample_rate).
+    """
+    try:
+        waveform, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except RuntimeError:  # soundfile.LibsndfileError: format not supported
+        registry.inc("stt_decode_fallback_total", help_text="Recordings decoded with ffmpeg instead of libsndfile")
+        return _decode_with_ffmpeg(data)
+    return waveform, sample_rate
+
+
+def _decode_with_ffmpeg(data: bytes):
+    try:
+        from pydub import AudioSegment
+    except ImportError:  # pydub (and an ffmpeg binary) are only needed for these formats
+        raise ValueError("This recording format needs pydub and ffmpeg. Run `pip install pydub` "
+                         "and install ffmpeg, or record as WAV.") from None
+    segment = AudioSegment.from_file(io.BytesIO(data))
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    # Interleaved integer PCM -> [frames, channels] floats in [-1, 1]
+    waveform = samples.reshape(-1, segment.channels) / float(1 << (8 * segment.sample_width - 1))
+    return waveform, segment.frame_rate
+
+
+def to_mono(waveform: np.ndarray) -> np.ndarray:
+    """Averages channels into one float32 channel."""
+    if waveform.ndim == 1:
+        return waveform.astype(np.float32, copy=False)
+    if waveform.shape[1] == 1:
+        return waveform[:, 0]
+    return waveform.mean(axis=1, dtype=np.float32)
+
+
+def resample(waveform: np.ndarray, orig_sr: int, target_sr: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Polyphase resampling (upsample, FIR low-pass, downsample) by the reduced
+    ratio target_sr / orig_sr, e.g. 48 kHz -> 16 kHz is a plain 1/3 decimation.
+    Much cheaper than librosa's default FFT-based high-quality resampler.
+    """
+    if orig_sr == target_sr:
+        return waveform
+    divisor = gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // divisor, int(orig_sr) // divisor
+    return resample_poly(waveform, up, down).astype(np.float32, copy=False)
+
+
+def speech_mask(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE,
+                frame_seconds: float = VAD_FRAME_SECONDS) -> np.ndarray:
+    """
+    Returns one bool per frame_seconds frame: True where the frame's RMS
+    energy is within VAD_RELATIVE_DB of the loudest frame and above
+    VAD_FLOOR_DB. Computed for all frames at once on a [frames, samples] view.
+    """
+    frame = max(1, int(frame_seconds * sample_rate))
+    count = len(waveform) // frame
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+    frames = waveform[:count * frame].reshape(count, frame)
+    db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-10)
+    return (db > db.max() - VAD_RELATIVE_DB) & (db > VAD_FLOOR_DB)
+
+
+def trim_silence(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE,
+                 max_pause_seconds: float = VAD_MAX_PAUSE_SECONDS) -> np.ndarray:
+    """
+    Cuts leading and trailing silence (keeping VAD_PADDING_SECONDS around
+    speech) and, when max_pause_seconds > 0, shortens longer pauses inside
+    the answer to that length. Returns the waveform unchanged if no speech
+    is detected, so the model still sees the (silent) recording.
+    """
+    frame = max(1, int(VAD_FRAME_SECONDS * sample_rate))
+    speech = speech_mask(waveform, sample_rate)
+    if not speech.any():
+        return waveform
+
+    # Widen every speech frame by the padding on both sides
+    pad = int(round(VAD_PADDING_SECONDS / VAD_FRAME_SECONDS))
+    if len(speech) < 2 * pad + 1:
+        # Shorter than the padding itself (e.g. the last live segment): nothing to trim
+        return waveform
+    speech = np.convolve(speech, np.ones(2 * pad + 1), mode="same") > 0
+
+    first = int(np.argmax(speech))
+    last = len(speech) - int(np.argmax(speech[::-1]))
+    keep = np.zeros(len(speech), dtype=bool)
+    keep[first:last] = True
+
+    max_pause = int(max_pause_seconds / VAD_FRAME_SECONDS)
+    if max_pause > 0:
+        silent = np.r_[False, ~speech[first:last], False].astype(np.int8)
+        edges = np.flatnonzero(np.diff(silent))
+        for start, end in zip(edges[::2] + first, edges[1::2] + first):
+            if end - start > max_pause:
+                # Keep half the allowed pause on each side of the cut
+                keep[start + max_pause // 2:end - (max_pause - max_pause // 2)] = False
+
+    samples = np.repeat(keep, frame)
+    # Samples after the last whole frame follow that frame
+    samples = np.r_[samples, np.full(len(waveform) - len(samples), keep[-1])]
+    return waveform[samples]
+
+
+def load_audio(data: bytes, target_sr: int = TARGET_SAMPLE_RATE, vad: bool = VAD_ENABLED) -> np.ndarray:
+    """
+    Decodes recording bytes into a mono float32 waveform at target_sr, without
+    temp files. With vad, silence is trimmed (see trim_silence) and the audio
+    seconds this saves the model are counted in stt_vad_seconds_saved_total.
+    """
+    waveform, sample_rate = decode_audio(data)
+    waveform = resample(to_mono(waveform), sample_rate, target_sr)
+    if not vad:
+        return waveform
+    trimmed = trim_silence(waveform, target_sr)
+    registry.inc("stt_audio_seconds_total", len(waveform) / target_sr,
+                 help_text="Seconds of recorded answer audio before silence trimming")
+    registry.inc("stt_vad_seconds_saved_total", (len(waveform) - len(trimmed)) / target_sr,
+                 help_text="Seconds of silence removed before transcription")
+    return trimmed
@@ -0,0 +1,35 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared worker pool for speculative and off-critical-path work
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "4"))
+# Separate pool for work a candidate is waiting on (the current question's voice),
+# so it never queues behind other sessions' prefetches and answer notes
+TURN_WORKERS = int(os.getenv("TURN_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS,
+    thread_name_prefix="prepy-bg",
+)
+
+_turn_executor = ThreadPoolExecutor(
+    max_workers=TURN_WORKERS,
+    thread_name_prefix="prepy-turn",
+)
+
+
+def submit_background(fn, *args, **kwargs):
+    """
+    Runs fn on the process-wide background pool and returns its Future.
+    fn runs outside the Streamlit script thread, so it must not call st.*
+    or touch st.session_state; hand results back through the Future instead.
+    """
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def submit_turn(fn, *args, **kwargs):
+    """
+    Like submit_background, but on the pool reserved for the live turn, so
+    the candidate's current question is never stuck behind speculative work.
+    """
+    return _turn_executor.submit(fn, *args, **kwargs)
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# How many of the most recent turns are sent word for word
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+# Approximate token budget for the history block of one interviewer call
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+# Approximate token budget for the answers digest of the notes-based report
+FEEDBACK_NOTES_TOKEN_BUDGET = int(os.getenv("FEEDBACK_NOTES_TOKEN_BUDGET", "2500"))
+
+_SENTENCE_RE = re.compile(r"[^.!?]+[.!?]*")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about 4 characters per token for English text).
+    Good enough for budgeting without a round trip to count_tokens.
+    """
+    return (len(text) + 3) // 4
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
+
+
+def _key_sentence(text: str) -> str:
+    """Picks the question the interviewer asked, falling back to the first sentence."""
+    sentences = [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+    if not sentences:
+        return text.strip()
+    questions = [s for s in sentences if s.endswith("?")]
+    return questions[-1] if questions else sentences[0]
+
+
+class HistoryManager:
+    """
+    Keeps the prompt size of the conversation history bounded.
+
+    The last `max_turns` turns are rendered verbatim; older turns are folded
+    into a running summary made of one compact note per turn. Notes are
+    memoized by turn content, so each turn is summarized once when it leaves
+    the verbatim window and the summary grows by one line per turn instead of
+    being rebuilt. The whole block is then fitted to `token_budget`,
+    dropping the oldest material first; the latest turn is never cut.
+    """
+
+    def __init__(self, max_turns: int = HISTORY_MAX_TURNS, token_budget: int = HISTORY_TOKEN_BUDGET,
+                 note_chars: int = 160, max_cached_notes: int = 4096):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.note_chars = note_chars
+        self.max_cached_notes = max_cached_notes
+        self._notes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _note(self, turn: dict) -> str:
+        key = hashlib.sha1(
+            f"{turn['interviewer']}\0{turn['candidate']}".encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            note = self._notes.get(key)
+            if note is not None:
+                self._notes.move_to_end(key)
+                return note
+
+        question = _shorten(_key_sentence(turn["interviewer"]), self.note_chars)
+        answer = _shorten(turn["candidate"], self.note_chars) if turn["candidate"] else "(no answer)"
+        note = f"- Q: {question} | A: {answer}"
+
+        with self._lock:
+            self._notes[key] = note
+            while len(self._notes) > self.max_cached_notes:
+                self._notes.popitem(last=False)
+        return note
+
+    @staticmethod
+    def _verbatim(turns: list, interviewer_label: str) -> str:
+        history_text = ""
+        for turn in turns:
+            history_text += f"{interviewer_label}: {turn['interviewer']}\n"
+            history_text += f"Candidate: {turn['candidate']}\n"
+        return history_text
+
+    @staticmethod
+    def _join(notes: list, dropped: int, verbatim: str) -> str:
+        if not notes and not dropped:
+            return verbatim
+        summary = ["Summary of earlier conversation:"]
+        if dropped:
+            summary.append(f"- ({dropped} earlier exchanges omitted)")
+        summary.extend(notes)
+        return "\n".join(summary) + "\n\nRecent conversation:\n" + verbatim
+
+    def render(self, conversation_history: list, interviewer_label: str = "Interviewer",
+               token_budget: int = None) -> str:
+        """
+        Returns the history text to put in a prompt, within the token budget.
+        Shrinks in this order: fewer verbatim turns (down to one), then drop
+        the oldest summary notes. The latest turn is always kept whole, even
+        if it alone exceeds the budget.
+        """
+        budget = token_budget or self.token_budget
+        turns = list(conversation_history)
+        keep = min(self.max_turns, len(turns))
+
+        while True:
+            older, recent = turns[:len(turns) - keep], turns[len(turns) - keep:]
+            notes = [self._note(t) for t in older]
+            verbatim = self._verbatim(recent, interviewer_label)
+            text = self._join(notes, 0, verbatim)
+            if keep <= 1 or estimate_tokens(text) <= budget:
+                break
+            keep -= 1
+
+        dropped = 0
+        while notes and estimate_tokens(text) > budget:
+            notes.pop(0)
+            dropped += 1
+            text = self._join(notes, dropped, verbatim)
+        return text
+
+    def render_transcript(self, conversation_history: list, interviewer_label: str = "Interviewer") -> str:
+        """Every turn word for word, with no budget (for the end-of-interview report)."""
+        return self._verbatim(conversation_history, interviewer_label)
+
+    def render_notes(self, conversation_history: list, answer_notes: list,
+                     interviewer_label: str = "Interviewer", token_budget: int = None,
+                     excerpt_chars: int = 600, notes_chars: int = 400) -> str:
+        """
+        Returns a bounded digest of the answered turns for the notes-based
+        report: the question asked, the evaluator's notes (answer_notes, one
+        per answered turn, None when unavailable) and an excerpt of the
+        answer. Excerpts share what the budget leaves after questions and
+        notes, up to excerpt_chars each.
+        """
+        budget = token_budget or FEEDBACK_NOTES_TOKEN_BUDGET
+        turns = [t for t in conversation_history if t["candidate"]]
+        headers = []
+        for i, (turn, notes) in enumerate(zip(turns, answer_notes), start=1):
+            question = _shorten(_key_sentence(turn["interviewer"]), self.note_chars)
+            notes = _shorten(notes, notes_chars) if notes else "(no notes)"
+            headers.append(f"Answer {i}\n{interviewer_label}: {question}\nNotes: {notes}\n")
+        if not headers:
+            return ""
+
+        label = "Candidate (excerpt): "
+        left = budget * 4 - sum(len(h) + len(label) + 2 for h in headers)
+        per_answer = min(excerpt_chars, max(0, left // len(headers)))
+        blocks = []
+        for header, turn in zip(headers, turns):
+            excerpt = _shorten(turn["candidate"], per_answer) if per_answer else ""
+            blocks.append(header + (f"{label}{excerpt}\n" if excerpt else ""))
+        return "\n".join(blocks)
+
+
+history_manager = HistoryManager()
+
+
+def render_history(conversation_history: list, interviewer_label: str = "Interviewer",
+                   token_budget: int = None) -> str:
+    """Renders conversation history with the shared process-wide HistoryManager."""
+    return history_manager.render(conversation_history, interviewer_label, token_budget)
+
+
+def render_transcript(conversation_history: list, interviewer_label: str = "Interviewer") -> str:
+    """Renders the full, unbudgeted transcript with the shared HistoryManager."""
+    return history_manager.render_transcript(conversation_history, interviewer_label)
+
+
+def render_notes(conversation_history: list, answer_notes: list, interviewer_label: str = "Interviewer",
+                 token_budget: int = None) -> str:
+    """Renders the bounded answers digest with the shared HistoryManager."""
+    return history_manager.render_notes(conversation_history, answer_notes, interviewer_label, token_budget)
@@ -0,0 +1,105 @@
+import base64
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE, VAD_ENABLED, speech_mask, trim_silence
+from backend.metrics import registry
+from backend.transcription import submit_transcription
+
+
+def decode_segment(data: str) -> np.ndarray:
+    """Decodes a base64 segment of little-endian int16 PCM at 16 kHz into float32."""
+    pcm = np.frombuffer(base64.b64decode(data), dtype="<i2")
+    return pcm.astype(np.float32) / 32768.0
+
+
+class LiveTranscription:
+    """
+    Transcribes one recording while it is still being made. The browser
+    (frontend/live_recorder) sends numbered segments cut at quiet points;
+    each one is queued for transcription as soon as it arrives, so when the
+    candidate stops only the last segment is still being decoded.
+
+    Segments may arrive more than once (the browser resends until they are
+    acknowledged) and are ignored the second time.
+    """
+
+    def __init__(self, recording_id: str):
+        self.recording_id = recording_id
+        self.finished = False
+        self.stopped_at = None  # server time.time() when the stop was first seen
+        self._segments = {}   # seq -> Future of the segment's text
+        self._seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_segment(self, seq: int, data: str):
+        """
+        Queues one segment for transcription and returns at once; the
+        engine runs on a worker thread (see submit_transcription).
+        """
+        with self._lock:
+            if seq in self._segments:
+                return
+        waveform = decode_segment(data)
+        seconds = len(waveform) / TARGET_SAMPLE_RATE
+        if VAD_ENABLED:
+            waveform = trim_silence(waveform)
+        if not speech_mask(waveform).any():
+            # Nothing but silence; Whisper tends to invent words for it
+            future = Future()
+            future.set_result("")
+        else:
+            future = submit_transcription(waveform)
+        with self._lock:
+            if seq not in self._segments:
+                self._segments[seq] = future
+                self._seconds += seconds
+
+    @property
+    def acked(self) -> int:
+        """Highest seq such that every segment up to it has been received (-1 if none)."""
+        with self._lock:
+            seq = -1
+            while seq + 1 in self._segments:
+                seq += 1
+            return seq
+
+    def partial_text(self) -> str:
+        """Transcript of the leading segments that are already decoded."""
+        parts = []
+        with self._lock:
+            for seq in sorted(self._segments):
+                future = self._segments[seq]
+                if not future.done() or future.exception() is not None:
+                    break
+                parts.append(future.result().strip())
+        return " ".join(p for p in parts if p)
+
+    def mark_stopped(self):
+        """
+        Records when the server first learned the candidate stopped. Taken
+        from the server clock, not the browser's, so client clock skew can't
+        distort stt_live_final_seconds.
+        """
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def finish(self) -> str:
+        """
+        Waits for the remaining segments and returns the full transcript.
+        If mark_stopped was called, records how long the final transcript
+        took after the candidate stopped talking.
+        """
+        with self._lock:
+            futures = [self._segments[seq] for seq in sorted(self._segments)]
+        texts = [future.result().strip() for future in futures]
+        self.finished = True
+        if self.stopped_at is not None:
+            registry.observe("stt_live_final_seconds", max(0.0, time.time() - self.stopped_at),
+                             help_text="Time from the end of a live recording to its full transcript")
+        registry.inc("stt_live_audio_seconds_total", self._seconds,
+                     help_text="Seconds of audio transcribed while recording")
+        return " ".join(t for t in texts if t)
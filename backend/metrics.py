@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; covers fast cache hits up to slow feedback reports
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+# Bytes; a spoken question is roughly 10 kB (low bitrate) to 500 kB (high)
+BYTE_BUCKETS = (8192, 16384, 32768, 65536, 131072, 262144, 524288, 1048576, 2097152)
+
+# Serve /metrics (Prometheus text) and /metrics.jsonl on this port when set
+METRICS_PORT = os.getenv("METRICS_PORT")
+# Loopback only by default; set to 0.0.0.0 to let a remote Prometheus scrape it
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+logger = logging.getLogger(__name__)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process registry of labelled counters, gauges and histograms.
+    Thread-safe; exported as Prometheus text exposition or JSON lines.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}        # name -> (type, help)
+        self._counters = {}    # (name, labels) -> value
+        self._gauges = {}      # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> {"buckets", "counts", "sum", "count"}
+
+    @staticmethod
+    def _labels(labels: dict) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _register(self, name: str, kind: str, help_text: str):
+        if name not in self._meta:
+            self._meta[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, help_text: str = "", **labels):
+        with self._lock:
+            self._register(name, "counter", help_text)
+            key = (name, self._labels(labels))
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, help_text: str = "", **labels):
+        with self._lock:
+            self._register(name, "gauge", help_text)
+            self._gauges[(name, self._labels(labels))] = value
+
+    def observe(self, name: str, value: float, help_text: str = "", buckets: tuple = DEFAULT_BUCKETS, **labels):
+        with self._lock:
+            self._register(name, "histogram", help_text)
+            key = (name, self._labels(labels))
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+                self._histograms[key] = hist
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> list:
+        """Returns one dict per series: name, type, labels and value(s)."""
+        with self._lock:
+            series = []
+            for (name, labels), value in self._counters.items():
+                series.append({"name": name, "type": "counter", "labels": dict(labels), "value": value})
+            for (name, labels), value in self._gauges.items():
+                series.append({"name": name, "type": "gauge", "labels": dict(labels), "value": value})
+            for (name, labels), hist in self._histograms.items():
+                series.append({
+                    "name": name,
+                    "type": "histogram",
+                    "labels": dict(labels),
+                    "buckets": dict(zip([str(b) for b in hist["buckets"]], hist["counts"])),
+                    "sum": hist["sum"],
+                    "count": hist["count"],
+                })
+        return sorted(series, key=lambda s: (s["name"], sorted(s["labels"].items())))
+
+    def to_json_lines(self) -> str:
+        now = time.time()
+        return "".join(json.dumps(dict(s, ts=now)) + "\n" for s in self.snapshot())
+
+    def to_prometheus(self) -> str:
+        def fmt(labels: dict) -> str:
+            if not labels:
+                return ""
+            inner = ",".join(f'{k}="{_escape_label(v)}"' for k, v in sorted(labels.items()))
+            return "{" + inner + "}"
+
+        lines = []
+        seen = set()
+        with self._lock:
+            meta = dict(self._meta)
+        for s in self.snapshot():
+            name = s["name"]
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = meta[name]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            if s["type"] == "histogram":
+                for bound, count in s["buckets"].items():
+                    lines.append(f"{name}_bucket{fmt(dict(s['labels'], le=bound))} {count}")
+                lines.append(f"{name}_bucket{fmt(dict(s['labels'], le='+Inf'))} {s['count']}")
+                lines.append(f"{name}_sum{fmt(s['labels'])} {s['sum']}")
+                lines.append(f"{name}_count{fmt(s['labels'])} {s['count']}")
+            else:
+                lines.append(f"{name}{fmt(s['labels'])} {s['value']}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def record_llm_call(call_type: str, model: str, seconds: float, usage: dict = None,
+                    status: str = "ok", first_token_seconds: float = None):
+    """
+    Records one model call: wall time, optional time to first token, and the
+    prompt / output / thinking / cached token counts reported by the backend.
+    """
+    usage = usage or {}
+    registry.inc("llm_calls_total", help_text="Model calls by type, model and outcome",
+                 call_type=call_type, model=model, status=status)
+    registry.observe("llm_call_seconds", seconds, help_text="Wall time per model call",
+                     call_type=call_type, model=model)
+    if first_token_seconds is not None:
+        registry.observe("llm_first_token_seconds", first_token_seconds,
+                         help_text="Time to first streamed chunk", call_type=call_type, model=model)
+    for kind in ("prompt", "output", "thinking", "cached"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens is None:
+            continue
+        registry.inc("llm_tokens_total", tokens, help_text="Tokens by call type and kind",
+                     call_type=call_type, model=model, kind=kind)
+        if kind == "prompt":
+            registry.observe("llm_prompt_tokens", tokens, help_text="Prompt size per call",
+                             buckets=TOKEN_BUCKETS, call_type=call_type, model=model)
+
+
+def _make_handler(metrics: MetricsRegistry):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.jsonl":
+                body, content_type = metrics.to_json_lines(), "application/x-ndjson"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None, host: str = METRICS_HOST):
+    """
+    Starts the metrics HTTP endpoint once per process (no-op when METRICS_PORT
+    is unset and no port is given). Safe to call on every Streamlit rerun.
+    If the port is taken (e.g. by another app process), logs a warning once
+    and returns None instead of failing the page.
+    """
+    global _server, _server_failed
+    port = port or (int(METRICS_PORT) if METRICS_PORT else None)
+    if port is None:
+        return None
+    with _server_lock:
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer((host, port), _make_handler(registry))
+            except OSError as e:
+                _server_failed = True
+                logger.warning("metrics endpoint not started on %s:%s: %s", host, port, e)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
+    return _server
@@ -1,27 +1,293 @@
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from elevenlabs.client import ElevenLabs
 
+from backend.cache import CACHE_DIR, DiskCache, content_hash
+from backend.metrics import BYTE_BUCKETS, registry
+from backend.scheduler import PRIORITY_TURN, current_priority, priority, tts_scheduler
 
-def speak_text(
-    text: str,
-    voice_id: str = "JBFqnCBsd6RMkjVDRZzb",
-    model_id: str = "eleven_multilingual_v2",
-    output_format: str = "mp3_44100_128"
-):
+DEFAULT_VOICE_ID = "JBFqnCBsd6RMkjVDRZzb"
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
+# Output format / bitrate profiles; lower bitrates cut bytes per turn on slow links
+TTS_PROFILES = {
+    "high": "mp3_44100_128",
+    "standard": "mp3_44100_64",
+    "low": "mp3_22050_32",
+    "opus": "opus_48000_32",
+}
+# Deployment-wide default profile; sessions may pick another one
+TTS_PROFILE = os.getenv("TTS_PROFILE", "high")
+
+
+def output_format_for(profile: str = None) -> str:
+    """Returns the ElevenLabs output_format for a profile name (default: TTS_PROFILE)."""
+    profile = profile or TTS_PROFILE
+    if profile not in TTS_PROFILES:
+        raise ValueError(f"Unknown TTS profile '{profile}'. Use one of: {', '.join(TTS_PROFILES)}.")
+    return TTS_PROFILES[profile]
+
+
+DEFAULT_OUTPUT_FORMAT = output_format_for()
+
+# "elevenlabs" (default) or "local" for the offline CPU engine in local_tts.py
+TTS_ENGINE = os.getenv("TTS_ENGINE", "elevenlabs")
+
+client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+# On-disk cache of synthesized audio, keyed by (text, voice, model, format)
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1") == "1"
+tts_cache = None
+if TTS_CACHE_ENABLED:
+    tts_cache = DiskCache(
+        os.path.join(CACHE_DIR, "tts_audio.sqlite"),
+        max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    )
+
+# Split multi-sentence replies and synthesize the pieces in parallel. Off by
+# default: the app plays a reply only once it is complete, so chunking costs
+# extra requests without starting playback sooner
+TTS_PARALLEL_CHUNKS = os.getenv("TTS_PARALLEL_CHUNKS", "0") == "1"
+TTS_CHUNK_WORKERS = int(os.getenv("TTS_CHUNK_WORKERS", "3"))
+TTS_CHUNK_MIN_CHARS = int(os.getenv("TTS_CHUNK_MIN_CHARS", "80"))
+_chunk_pool = ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS, thread_name_prefix="prepy-tts")
+
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+[\"')\]]*(?=\s|$)|$)", re.S)
+
+
+def _get_client():
+    """One ElevenLabs client (and HTTP connection pool) per process and API key."""
+    global client, _client_key
     api_key = os.getenv("ELEVENLABS_API_KEY")
     if not api_key:
         raise RuntimeError(
             "ELEVENLABS_API_KEY is not set."
         )
+    with _client_lock:
+        if client is None or _client_key != api_key:
+            client = ElevenLabs(api_key=api_key)
+            _client_key = api_key
+    return client
 
-    client = ElevenLabs(api_key=api_key)
 
-    audio_generator = client.text_to_speech.convert(
-        text=text,
-        voice_id=voice_id,
-        model_id=model_id,
-        output_format=output_format
-    )
+def _cache_key(text: str, voice_id: str, model_id: str, output_format: str) -> str:
+    return content_hash(text, voice_id, model_id, output_format)
+
+
+def _cache_get(key: str):
+    if tts_cache is None:
+        return None
+    audio = tts_cache.get(key)
+    registry.inc("tts_cache_lookups_total", help_text="TTS cache lookups by result",
+                 result="hit" if audio is not None else "miss")
+    return audio
+
+
+def split_sentences(text: str, min_chars: int = TTS_CHUNK_MIN_CHARS) -> list:
+    """
+    Splits text at sentence boundaries for chunked synthesis. The first
+    sentence stays on its own so the first clip comes back quickly; later
+    sentences are merged until each chunk has at least min_chars.
+    """
+    sentences = [s.strip() for s in _SENTENCE.findall(text.strip()) if s.strip()]
+    if len(sentences) <= 1:
+        return sentences
+    chunks = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= min_chars:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _strip_id3(audio: bytes) -> bytes:
+    """Drops a leading ID3v2 tag so MP3 clips can be concatenated frame to frame."""
+    if len(audio) < 10 or audio[:3] != b"ID3":
+        return audio
+    size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+    footer = 10 if audio[5] & 0x10 else 0
+    return audio[10 + size + footer:]
+
+
+def join_audio_clips(clips: list, output_format: str = DEFAULT_OUTPUT_FORMAT) -> bytes:
+    """
+    Concatenates per-chunk clips into one stream. MP3 and raw PCM/u-law are
+    frame- or sample-aligned and concatenate directly (after dropping any
+    repeated ID3 header).
+    """
+    if output_format.startswith("mp3"):
+        clips = clips[:1] + [_strip_id3(clip) for clip in clips[1:]]
+    return b"".join(clips)
+
+
+def audio_mime_type(output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+    """MIME type of the audio speak_text returns, for the player."""
+    if TTS_ENGINE == "local":
+        return "audio/wav"
+    if output_format.startswith("opus"):
+        return "audio/ogg"
+    return "audio/mp3"
+
+
+def get_tts_cache_stats() -> dict:
+    """Returns hit/miss/eviction stats for the TTS audio cache (empty when disabled)."""
+    return tts_cache.stats() if tts_cache is not None else {}
+
+
+def _synthesize_stream(text: str, voice_id: str, model_id: str, output_format: str):
+    """
+    Synthesizes text with a single streaming request and yields audio chunks
+    as they arrive. Holds a TTS scheduler slot until the stream is exhausted
+    or closed.
+    """
+    tts = _get_client()
+    with tts_scheduler.slot(PRIORITY_TURN):
+        started = time.perf_counter()
+        first_chunk = None
+        total = 0
+        for chunk in tts.text_to_speech.stream(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=output_format
+        ):
+            if not chunk:
+                continue
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+                registry.observe("tts_first_chunk_seconds", first_chunk,
+                                 help_text="Time to first audio chunk", model=model_id)
+            total += len(chunk)
+            yield chunk
+
+    registry.observe("tts_seconds", time.perf_counter() - started,
+                     help_text="Wall time per synthesis", model=model_id)
+    registry.inc("tts_characters_total", len(text), help_text="Characters sent for synthesis", model=model_id)
+    registry.inc("tts_bytes_total", total, help_text="Audio bytes received", model=model_id,
+                 output_format=output_format)
+
+
+def speak_text_stream(
+    text: str,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+):
+    """
+    Yields audio chunks for text as they arrive, so playback or further
+    processing can start on the first frames. Served from the audio cache
+    when this exact (text, voice, model, format) was synthesized before;
+    otherwise one streaming request is made and the result is cached.
+    """
+    key = _cache_key(text, voice_id, model_id, output_format)
+    cached = _cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for chunk in _synthesize_stream(text, voice_id, model_id, output_format):
+        chunks.append(chunk)
+        yield chunk
+    if tts_cache is not None and chunks:
+        tts_cache.put(key, b"".join(chunks))
+
+
+def speak_text(
+    text: str,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> bytes:
+    """
+    Converts text to speech and returns the complete audio bytes. With
+    TTS_ENGINE=local the offline engine is used and the ElevenLabs ids are
+    ignored (see _speak_local). Otherwise, with TTS_PARALLEL_CHUNKS,
+    sentences are synthesized in parallel and reassembled in order (see
+    speak_text_chunks); otherwise exactly one streaming request is made
+    (see speak_text_stream).
+    """
+    if TTS_ENGINE == "local":
+        audio = _speak_local(text)
+        output_format = "wav"
+    elif TTS_PARALLEL_CHUNKS and not output_format.startswith("opus"):
+        # Opus clips would join into a chained Ogg stream, which not every browser plays through
+        audio = join_audio_clips(list(speak_text_chunks(text, voice_id, model_id, output_format)), output_format)
+    else:
+        audio = b"".join(speak_text_stream(text, voice_id, model_id, output_format))
+    registry.observe("tts_reply_bytes", len(audio), help_text="Audio bytes per spoken reply",
+                     buckets=BYTE_BUCKETS, output_format=output_format)
+    return audio
+
+
+def _speak_local(text: str) -> bytes:
+    """Synthesizes WAV audio with the offline engine, through the audio cache."""
+    # Imported here so torch and the model only load when this engine is selected
+    from backend.models import local_tts
+
+    key = content_hash("local", text, local_tts.LOCAL_TTS_MODEL, local_tts.LOCAL_TTS_SPEAKER,
+                       local_tts.LOCAL_TTS_SPEED)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+    audio = local_tts.synthesize(text, sentences=split_sentences(text))
+    registry.observe("tts_seconds", time.perf_counter() - started,
+                     help_text="Wall time per synthesis", model=local_tts.LOCAL_TTS_MODEL)
+    registry.inc("tts_characters_total", len(text), help_text="Characters sent for synthesis",
+                 model=local_tts.LOCAL_TTS_MODEL)
+    if tts_cache is not None:
+        tts_cache.put(key, audio)
+    return audio
+
+
+def _speak_chunk(level: int, text: str, voice_id: str, model_id: str, output_format: str) -> bytes:
+    with priority(level):
+        return b"".join(speak_text_stream(text, voice_id, model_id, output_format))
+
+
+def speak_text_chunks(
+    text: str,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+):
+    """
+    Yields one self-contained, playable audio clip per sentence chunk, in
+    order. All chunks are synthesized in parallel on a bounded pool (each
+    through the audio cache), and each clip is yielded as soon as it and the
+    ones before it are ready, so a caller that plays clips one by one can
+    start on the first sentence (speak_text joins them instead).
+    """
+    chunks = split_sentences(text)
+    if not chunks:
+        return
+    started = time.perf_counter()
+    level = current_priority(PRIORITY_TURN)
+    futures = [
+        _chunk_pool.submit(_speak_chunk, level, chunk, voice_id, model_id, output_format)
+        for chunk in chunks
+    ]
+    try:
+        for index, future in enumerate(futures):
+            clip = future.result()
+            if index == 0:
+                registry.observe("tts_first_clip_seconds", time.perf_counter() - started,
+                                 help_text="Time until the first sentence of a reply is playable",
+                                 model=model_id)
+            yield clip
+    finally:
+        # Abandoned early (or failed): don't synthesize the remaining sentences
+        for future in futures:
+            future.cancel()
 
-    audio_bytes = b"".join(audio_generator)
-    return audio_bytes
@@ -1,7 +1,6 @@
 from dotenv import load_dotenv
-from elevenlabs.client import ElevenLabs
-import os
-from elevenlabs.play import play
+
+from backend.models import audio_tts
 
 
 # Load .env variables
@@ -16,32 +15,8 @@ def speak_text(
 ):
     """
     Converts text to speech using ElevenLabs and returns audio bytes.
+    Kept for app.py; delegates to the single-request audio_tts.speak_text.
     """
-
-    api_key = os.getenv("ELEVENLABS_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "ELEVENLABS_API_KEY is not set. Make sure your .env file exists in the project folder."
-        )
-
-    # Create client inside the function to avoid scope issues
-    client = ElevenLabs(api_key=api_key)
-
-    audio_bytes = client.text_to_speech.convert(
-        text=text,
-        voice_id=voice_id,
-        model_id=model_id,
-        output_format=output_format
-    )
-    # The SDK returns a generator; convert it to bytes
-    audio_generator = client.text_to_speech.convert(
-        text=text,
-        voice_id=voice_id,
-        model_id=model_id,
-        output_format=output_format
-    )
-
-    audio_bytes = b"".join(audio_generator)  # collect generator into bytes
-    return audio_bytes
+    return audio_tts.speak_text(text, voice_id, model_id, output_format)
 
 
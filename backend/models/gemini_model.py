@@ -1,10 +1,57 @@
-from google import genai
+import hashlib
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 
-client = None
-api_key = os.getenv("GOOGLE_API_KEY")
-if api_key:
-    client = genai.Client(api_key=api_key)
+from backend.cache import CACHE_DIR, DiskCache, content_hash
+from backend.history import estimate_tokens, render_history, render_notes, render_transcript
+from backend.metrics import record_llm_call, registry
+from backend.scheduler import PRIORITY_BACKGROUND, PRIORITY_FEEDBACK, PRIORITY_TURN, llm_scheduler
+from backend.models.llm_backend import (
+    LLM_FEEDBACK_ATTEMPT_TIMEOUT_SECONDS,
+    LLM_FEEDBACK_DEADLINE_SECONDS,
+    get_backend,
+)
+from backend.resilience import call_budget, is_cached_context_error
+
+logger = logging.getLogger(__name__)
+
+# Explicit context caching of the static interview prefix (prompt, JD, resume).
+# Set GEMINI_CONTEXT_CACHE=0 to always send the prefix inline.
+CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "1") != "0"
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# Interview prefixes remembered at once; the least recently used is forgotten first
+CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CONTEXT_CACHE_MAX_ENTRIES", "256"))
+
+# prefix hash -> {"name": cache name or None, "expires_at": epoch seconds}, least recently used first
+_context_caches = OrderedDict()
+_context_cache_lock = threading.Lock()
+
+# Scheduling priority per call type: live turns, then reports, then background notes
+CALL_PRIORITY = {
+    "first_question": PRIORITY_TURN,
+    "follow_up": PRIORITY_TURN,
+    "answer_notes": PRIORITY_BACKGROUND,
+    "feedback": PRIORITY_FEEDBACK,
+}
+
+# Per-attempt timeout and overall deadline per call type (others use the LLM_* defaults)
+CALL_BUDGET = {
+    "feedback": (LLM_FEEDBACK_ATTEMPT_TIMEOUT_SECONDS, LLM_FEEDBACK_DEADLINE_SECONDS),
+}
+
+# Opt-in on-disk cache of full responses, keyed by model + prompt + config.
+# Enable with GEMINI_RESPONSE_CACHE=1 (useful for demos and replayed QA runs).
+RESPONSE_CACHE_ENABLED = os.getenv("GEMINI_RESPONSE_CACHE", "0") == "1"
+response_cache = None
+if RESPONSE_CACHE_ENABLED:
+    response_cache = DiskCache(
+        os.path.join(CACHE_DIR, "gemini_responses.sqlite"),
+        max_bytes=int(os.getenv("GEMINI_RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024,
+        ttl_seconds=float(os.getenv("GEMINI_RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    )
 
 
 def load_prompt(prompt_name: str) -> str:
@@ -18,40 +65,38 @@ def load_prompt(prompt_name: str) -> str:
 
 INTERVIEWER_PROMPT = load_prompt("interviewer.txt")
 INTERVIEWER_FEEDBACK_PROMPT = load_prompt("evaluation.txt")
+ANSWER_NOTES_PROMPT = load_prompt("answer_notes.txt")
 
 
-def _get_client():
-    global client
-    if client is None:
-        key = os.getenv("GOOGLE_API_KEY")
-        if not key:
-            raise ValueError("Missing API key. Please set the GOOGLE_API_KEY secret.")
-        client = genai.Client(api_key=key)
-    return client
-
-
-def interview_response(
-    job_description: str,
-    resume_text: str,
-    conversation_history: list,
-    user_input: str,
-    interviewer_name: str = "Stacy"
-) -> str:
-    history_text = ""
-    for turn in conversation_history:
-        history_text += f"{interviewer_name}: {turn['interviewer']}\n"
-        history_text += f"Candidate: {turn['candidate']}\n"
-
-    full_prompt = f"""
+def _build_interview_prefix(job_description: str, resume_text: str) -> str:
+    """
+    Static part of the interviewer prompt. It is identical on every turn of an
+    interview, so it can be registered once as a cached context.
+    """
+    return f"""
 {INTERVIEWER_PROMPT}
 
-Your name is {interviewer_name}. Introduce yourself by this name at the start of the interview.
-
 Job Description:
 {job_description}
 
 Candidate Resume:
 {resume_text}
+"""
+
+
+def _build_interview_turn(
+    conversation_history: list,
+    user_input: str,
+    interviewer_name: str,
+) -> str:
+    """
+    Per-turn part of the interviewer prompt: everything that changes between
+    calls (interviewer name, history, latest answer) goes after the prefix.
+    """
+    history_text = render_history(conversation_history, interviewer_name)
+
+    return f"""
+Your name is {interviewer_name}. Introduce yourself by this name at the start of the interview.
 
 Conversation so far:
 {history_text}
@@ -62,30 +107,247 @@ Candidate just said:
 Respond as {interviewer_name}, the interviewer. Do not use markdown formatting like asterisks for bold or italics in your response.
 """
 
-    print(f"[DEBUG interview_response] user_input ({len(user_input)} chars): {user_input[:200]}")
-    print(f"[DEBUG interview_response] history turns: {len(conversation_history)}")
 
-    response = _get_client().models.generate_content(
-        model="gemini-2.5-flash",
-        contents=full_prompt,
-    )
+def _prefix_key(prefix: str) -> str:
+    return hashlib.sha256(f"{get_backend().model_name}\0{prefix}".encode("utf-8")).hexdigest()
+
+
+def _get_context_cache(prefix: str):
+    """
+    Returns the cached-content name holding this interview prefix, creating it
+    on first use. Returns None when caching is disabled or not possible (for
+    example when the prefix is below the model's minimum cacheable size); the
+    caller then sends the prefix inline.
+    """
+    if not CONTEXT_CACHE_ENABLED:
+        return None
+
+    key = _prefix_key(prefix)
+    now = time.time()
+    with _context_cache_lock:
+        entry = _context_caches.get(key)
+        if entry is None or entry["expires_at"] <= now:
+            entry = None
+        else:
+            _context_caches.move_to_end(key)
+    # "inline": the prefix is known, but caching it failed, so it is sent inline
+    result = "miss" if entry is None else "hit" if entry["name"] else "inline"
+    registry.inc("llm_context_cache_lookups_total", help_text="Interview prefix context cache lookups by result",
+                 result=result)
+    if entry is not None:
+        return entry["name"]
+
+    try:
+        with llm_scheduler.slot(PRIORITY_TURN):
+            name = get_backend().create_cached_context(
+                prefix,
+                CONTEXT_CACHE_TTL_SECONDS,
+                display_name=f"interview-{key[:16]}",
+            )
+        registry.inc("llm_context_cache_created_total", help_text="Interview prefixes registered as cached contexts")
+        logger.debug("created cached context %s for prefix %s", name, key[:12])
+    except Exception as e:
+        # Remember the failure for the TTL so we don't retry on every turn
+        registry.inc("llm_context_cache_unavailable_total",
+                     help_text="Interview prefixes sent inline because context caching failed")
+        logger.warning("context caching unavailable, sending prefix inline: %s", e)
+        name = None
+
+    with _context_cache_lock:
+        # Expire our entry slightly before the server does
+        _context_caches[key] = {
+            "name": name,
+            "expires_at": now + max(CONTEXT_CACHE_TTL_SECONDS - 60, 0),
+        }
+        _context_caches.move_to_end(key)
+        _prune_context_caches(now)
+    return name
+
+
+def _prune_context_caches(now: float):
+    """Drops expired entries, then the least recently used ones above the cap. Call with the lock held."""
+    for key in [k for k, entry in _context_caches.items() if entry["expires_at"] <= now]:
+        del _context_caches[key]
+    while len(_context_caches) > CONTEXT_CACHE_MAX_ENTRIES:
+        _context_caches.popitem(last=False)
+
+
+def _response_cache_key(full_prompt: str, generation_config: dict = None) -> str:
+    return content_hash(get_backend().model_name, full_prompt, generation_config or {})
+
 
-    result = response.text.strip()
-    print(f"[DEBUG interview_response] Gemini response ({len(result)} chars): {result[:200]}")
+def _cached_response(cache_key: str, call_type: str):
+    if response_cache is None:
+        return None
+    value = response_cache.get(cache_key)
+    registry.inc("llm_response_cache_lookups_total", help_text="Response cache lookups by result",
+                 result="hit" if value is not None else "miss", call_type=call_type)
+    return value.decode("utf-8") if value is not None else None
+
+
+def _store_response(cache_key: str, text: str):
+    if response_cache is not None and text:
+        response_cache.put(cache_key, text.encode("utf-8"))
+
+
+def get_response_cache_stats() -> dict:
+    """Returns hit-rate stats for the on-disk response cache (empty when disabled)."""
+    return response_cache.stats() if response_cache is not None else {}
+
+
+def _timed_generate(call_type: str, prompt: str, cached_context: str = None, fast: bool = False) -> str:
+    """
+    Backend call that waits for a slot in the shared scheduler (under the
+    call type's timeout budget), then records wall time and token usage
+    under call_type.
+    """
+    backend = get_backend()
+    usage = {}
+    with llm_scheduler.slot(CALL_PRIORITY[call_type]), call_budget(*CALL_BUDGET.get(call_type, ())):
+        started = time.perf_counter()
+        try:
+            result = backend.generate(prompt, cached_context=cached_context, fast=fast, usage=usage)
+        except Exception:
+            record_llm_call(call_type, backend.model_name, time.perf_counter() - started, usage, status="error")
+            raise
+    record_llm_call(call_type, backend.model_name, time.perf_counter() - started, usage)
     return result
 
 
-def interview_feedback(
+def _timed_stream(call_type: str, prompt: str, cached_context: str = None):
+    """
+    Streaming counterpart of _timed_generate; also records time to first chunk.
+    The scheduler slot is held until the stream is exhausted or closed.
+    """
+    backend = get_backend()
+    usage = {}
+    first_token = None
+    with llm_scheduler.slot(CALL_PRIORITY[call_type]), call_budget(*CALL_BUDGET.get(call_type, ())):
+        started = time.perf_counter()
+        try:
+            for chunk in backend.generate_stream(prompt, cached_context=cached_context, usage=usage):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                yield chunk
+        except Exception:
+            record_llm_call(call_type, backend.model_name, time.perf_counter() - started, usage,
+                            status="error", first_token_seconds=first_token)
+            raise
+    record_llm_call(call_type, backend.model_name, time.perf_counter() - started, usage,
+                    first_token_seconds=first_token)
+
+
+def _generate(call_type: str, full_prompt: str, fast: bool = False) -> str:
+    """Single non-streaming call with the response cache in front of it."""
+    cache_key = _response_cache_key(full_prompt, {"fast": fast})
+    result = _cached_response(cache_key, call_type)
+    if result is not None:
+        return result
+
+    result = _timed_generate(call_type, full_prompt, fast=fast)
+    _store_response(cache_key, result)
+    return result
+
+
+def _invalidate_context_cache(prefix: str):
+    with _context_cache_lock:
+        _context_caches.pop(_prefix_key(prefix), None)
+
+
+def _interview_request(prefix: str, turn_text: str, use_cache: bool = True):
+    """
+    Builds (prompt, cached_context) for an interviewer call. With a cached
+    context only the per-turn text is sent; otherwise the full prompt is sent
+    with the static prefix first, which still lets implicit prefix caching work.
+    """
+    cache_name = _get_context_cache(prefix) if use_cache else None
+    if cache_name:
+        return turn_text, cache_name
+    return prefix + turn_text, None
+
+
+def interview_response(
     job_description: str,
     resume_text: str,
     conversation_history: list,
+    user_input: str,
+    interviewer_name: str = "Stacy"
 ) -> str:
-    history_text = ""
-    for turn in conversation_history:
-        history_text += f"Interviewer: {turn['interviewer']}\n"
-        history_text += f"Candidate: {turn['candidate']}\n"
+    prefix = _build_interview_prefix(job_description, resume_text)
+    turn_text = _build_interview_turn(conversation_history, user_input, interviewer_name)
 
-    full_prompt = f"""
+    logger.debug("interview_response: answer of %d chars, %d history turns",
+                 len(user_input), len(conversation_history))
+
+    call_type = "follow_up" if conversation_history else "first_question"
+    cache_key = _response_cache_key(prefix + turn_text)
+    result = _cached_response(cache_key, call_type)
+    if result is not None:
+        return result
+
+    prompt, cached_context = _interview_request(prefix, turn_text)
+    try:
+        result = _timed_generate(call_type, prompt, cached_context=cached_context)
+    except Exception as e:
+        if not cached_context or not is_cached_context_error(e):
+            raise
+        # The cached context was evicted or expired server-side; resend inline
+        _invalidate_context_cache(prefix)
+        prompt, _ = _interview_request(prefix, turn_text, use_cache=False)
+        result = _timed_generate(call_type, prompt)
+
+    logger.debug("interview_response: reply of %d chars", len(result))
+    _store_response(cache_key, result)
+    return result
+
+
+def interview_response_stream(
+    job_description: str,
+    resume_text: str,
+    conversation_history: list,
+    user_input: str,
+    interviewer_name: str = "Stacy"
+):
+    """
+    Streaming variant of interview_response.
+    Yields text chunks as Gemini produces them instead of waiting for the
+    whole reply, so the UI can show the first words right away.
+    """
+    prefix = _build_interview_prefix(job_description, resume_text)
+    turn_text = _build_interview_turn(conversation_history, user_input, interviewer_name)
+
+    logger.debug("interview_response_stream: answer of %d chars, %d history turns",
+                 len(user_input), len(conversation_history))
+
+    call_type = "follow_up" if conversation_history else "first_question"
+    cache_key = _response_cache_key(prefix + turn_text)
+    result = _cached_response(cache_key, call_type)
+    if result is not None:
+        yield result
+        return
+
+    prompt, cached_context = _interview_request(prefix, turn_text)
+    parts = []
+    try:
+        for chunk in _timed_stream(call_type, prompt, cached_context=cached_context):
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        if not cached_context or parts or not is_cached_context_error(e):
+            raise
+        # The cached context was evicted or expired server-side; resend inline
+        _invalidate_context_cache(prefix)
+        prompt, _ = _interview_request(prefix, turn_text, use_cache=False)
+        for chunk in _timed_stream(call_type, prompt):
+            parts.append(chunk)
+            yield chunk
+
+    _store_response(cache_key, "".join(parts).strip())
+
+
+def _feedback_prompt(job_description: str, resume_text: str, history_text: str,
+                     history_title: str = "Conversation so far") -> str:
+    return f"""
 {INTERVIEWER_FEEDBACK_PROMPT}
 
 Job Description:
@@ -94,15 +356,72 @@ Job Description:
 Candidate Resume:
 {resume_text}
 
-Conversation so far:
+{history_title}:
 {history_text}
 
 Provide professional interview feedback and evaluation of the candidate.
 Include strengths, weaknesses, and concrete improvement suggestions.
 """
 
-    response = _get_client().models.generate_content(
-        model="gemini-2.5-flash",
-        contents=full_prompt,
+
+def interview_feedback(
+    job_description: str,
+    resume_text: str,
+    conversation_history: list,
+) -> str:
+    # The report judges every answer, so it gets the whole transcript, unbudgeted
+    history_text = render_transcript(conversation_history, "Interviewer")
+    return _generate("feedback", _feedback_prompt(job_description, resume_text, history_text))
+
+
+def evaluate_answer(
+    job_description: str,
+    question: str,
+    answer: str,
+) -> str:
+    """
+    Scores a single answer right after it is given and returns compact notes
+    (score, summary, strength, suggestion). Meant to run in the background;
+    the final report reads these notes alongside the full transcript.
+    """
+    full_prompt = f"""
+{ANSWER_NOTES_PROMPT}
+
+Job Description:
+{job_description}
+
+Interview question:
+{question}
+
+Candidate answer:
+{answer}
+"""
+
+    return _generate("answer_notes", full_prompt, fast=True)
+
+
+def feedback_from_notes(
+    job_description: str,
+    resume_text: str,
+    conversation_history: list,
+    answer_notes: list,
+) -> str:
+    """
+    Builds the final feedback report from the per-answer notes produced by
+    evaluate_answer in the background (one per answered turn, None where
+    they are missing), with the resume and a bounded excerpt of every
+    answer (see HistoryManager.render_notes), so the prompt stops growing
+    with the length of the interview. Short interviews whose full
+    transcript is smaller than the digest get the full transcript instead.
+    """
+    digest = render_notes(conversation_history, answer_notes, "Interviewer")
+    transcript = render_transcript(conversation_history, "Interviewer")
+    if estimate_tokens(transcript) <= estimate_tokens(digest):
+        return interview_feedback(job_description, resume_text, conversation_history)
+
+    registry.inc("feedback_from_notes_total", help_text="Reports built from the bounded answer notes digest")
+    return _generate(
+        "feedback",
+        _feedback_prompt(job_description, resume_text, digest,
+                         "Answers with the evaluator's notes, taken answer by answer during the interview"),
     )
-    return response.text.strip()
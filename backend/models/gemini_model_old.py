@@ -1,18 +1,12 @@
-from google import genai
 from dotenv import load_dotenv
 import os
 
+from backend.models.llm_backend import get_backend
+
 # Load environment
 load_dotenv()
 
-# Configure Gemini
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    raise ValueError(
-        "Missing API key. Set GOOGLE_API_KEY"
-    )
-
-client = genai.Client(api_key=api_key)
+# The shared backend creates its client lazily on the first call
 
 # Load prompt from file
 def load_prompt(prompt_name: str) -> str:
@@ -65,14 +59,7 @@ Candidate just said:
 Respond as the interviewer.
 """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=full_prompt,
-    )
-   
-
-   
-    return response.text.strip()
+    return get_backend().generate(full_prompt)
 
 
 def interview_feedback(
@@ -106,10 +93,6 @@ Provide professional interview feedback and evaluation of the candidate.
 Include strengths, weaknesses, and concrete improvement suggestions.
 """
     
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=full_prompt,
-    )
-    return response.text.strip()
+    return get_backend().generate(full_prompt)
 
 
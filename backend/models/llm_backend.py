@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import httpx
+from google import genai
+from google.genai import types
+
+from backend.resilience import CircuitBreaker, ResilientCaller
+
+# Which backend interview_response / interview_feedback go through:
+# "gemini" (default) or "local" (the stand-in server in local_llm_server.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+LOCAL_LLM_URL = os.getenv("LOCAL_LLM_URL", "http://127.0.0.1:8799")
+
+# Tail-latency controls for every LLM call (see backend/resilience.py)
+LLM_RESILIENCE = os.getenv("LLM_RESILIENCE", "1") == "1"
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "30"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+# The end-of-interview report (full context, thinking on) is the slowest call; it gets its own budget
+LLM_FEEDBACK_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_FEEDBACK_ATTEMPT_TIMEOUT_SECONDS", "90"))
+LLM_FEEDBACK_DEADLINE_SECONDS = float(os.getenv("LLM_FEEDBACK_DEADLINE_SECONDS", "150"))
+# Transport timeout: long enough for the longest per-call-type budget
+LLM_TRANSPORT_TIMEOUT_SECONDS = max(LLM_DEADLINE_SECONDS, LLM_FEEDBACK_DEADLINE_SECONDS)
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") == "1"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+
+class LLMBackend(ABC):
+    """
+    Interface every text-generation backend implements.
+
+    `cached_context` is an opaque handle returned by create_cached_context;
+    `fast` asks for the lowest-latency mode the backend offers (for Gemini,
+    no thinking phase). When a `usage` dict is passed, the backend fills in
+    prompt_tokens, output_tokens, thinking_tokens and cached_tokens as far as
+    it knows them. Backends are shared by all sessions in the process and
+    must be thread-safe.
+    """
+
+    name = "base"
+    model_name = ""
+
+    @abstractmethod
+    def generate(self, prompt: str, cached_context: str = None, fast: bool = False,
+                 usage: dict = None) -> str:
+        """Returns the full reply."""
+
+    @abstractmethod
+    def generate_stream(self, prompt: str, cached_context: str = None, fast: bool = False,
+                        usage: dict = None):
+        """Yields text chunks as they are produced."""
+
+    @abstractmethod
+    def create_cached_context(self, prefix: str, ttl_seconds: int, display_name: str = None) -> str:
+        """
+        Registers a reusable prompt prefix and returns its handle. Backends
+        without context caching raise NotImplementedError; callers then send
+        the prefix inline.
+        """
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through one genai.Client (and its HTTP connection pool) per process."""
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL, api_key: str = None):
+        self.model_name = model_name
+        self._api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Created lazily so a missing key surfaces as a ValueError in the UI,
+        # not as an import-time crash
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    key = self._api_key or os.getenv("GOOGLE_API_KEY")
+                    if not key:
+                        raise ValueError("Missing API key. Please set the GOOGLE_API_KEY secret.")
+                    self._client = genai.Client(
+                        api_key=key,
+                        # Transport timeout so abandoned attempts don't hold threads forever
+                        http_options=types.HttpOptions(timeout=int(LLM_TRANSPORT_TIMEOUT_SECONDS * 1000)),
+                    )
+        return self._client
+
+    @staticmethod
+    def _config(cached_context: str = None, fast: bool = False):
+        kwargs = {}
+        if cached_context:
+            kwargs["cached_content"] = cached_context
+        if fast:
+            kwargs["thinking_config"] = types.ThinkingConfig(thinking_budget=0)
+        return types.GenerateContentConfig(**kwargs) if kwargs else None
+
+    @staticmethod
+    def _fill_usage(usage: dict, metadata):
+        if usage is None or metadata is None:
+            return
+        usage["prompt_tokens"] = metadata.prompt_token_count or 0
+        usage["output_tokens"] = metadata.candidates_token_count or 0
+        usage["thinking_tokens"] = metadata.thoughts_token_count or 0
+        usage["cached_tokens"] = metadata.cached_content_token_count or 0
+
+    def generate(self, prompt: str, cached_context: str = None, fast: bool = False,
+                 usage: dict = None) -> str:
+        response = self.client.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config=self._config(cached_context, fast),
+        )
+        self._fill_usage(usage, response.usage_metadata)
+        return response.text.strip()
+
+    def generate_stream(self, prompt: str, cached_context: str = None, fast: bool = False,
+                        usage: dict = None):
+        metadata = None
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt,
+            config=self._config(cached_context, fast),
+        ):
+            # Usage totals arrive on the final chunk
+            metadata = chunk.usage_metadata or metadata
+            if chunk.text:
+                yield chunk.text
+        self._fill_usage(usage, metadata)
+
+    def create_cached_context(self, prefix: str, ttl_seconds: int, display_name: str = None) -> str:
+        cache = self.client.caches.create(
+            model=self.model_name,
+            config=types.CreateCachedContentConfig(
+                contents=[prefix],
+                ttl=f"{ttl_seconds}s",
+                display_name=display_name,
+            ),
+        )
+        return cache.name
+
+
+class LocalBackend(LLMBackend):
+    """
+    Client for the local stand-in server (backend/models/local_llm_server.py).
+    Uses one keep-alive httpx connection pool for the whole process.
+    """
+
+    name = "local"
+
+    def __init__(self, base_url: str = LOCAL_LLM_URL, model_name: str = "local-standin",
+                 timeout: float = LLM_TRANSPORT_TIMEOUT_SECONDS, max_connections: int = 64):
+        self.model_name = model_name
+        self._http = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def generate(self, prompt: str, cached_context: str = None, fast: bool = False,
+                 usage: dict = None) -> str:
+        response = self._http.post("/v1/generate", json={"prompt": prompt, "stream": False})
+        response.raise_for_status()
+        payload = response.json()
+        if usage is not None:
+            usage.update(payload.get("usage", {}))
+        return payload["text"].strip()
+
+    def generate_stream(self, prompt: str, cached_context: str = None, fast: bool = False,
+                        usage: dict = None):
+        with self._http.stream("POST", "/v1/generate", json={"prompt": prompt, "stream": True}) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if usage is not None and chunk.get("usage"):
+                    usage.update(chunk["usage"])
+                if chunk.get("text"):
+                    yield chunk["text"]
+
+    def create_cached_context(self, prefix: str, ttl_seconds: int, display_name: str = None) -> str:
+        raise NotImplementedError(f"The {self.name} backend does not support context caching.")
+
+
+class ResilientBackend(LLMBackend):
+    """
+    Wraps another backend with per-call deadlines, jittered retry, optional
+    hedged requests and a circuit breaker, so a slow or failing upstream call
+    can't hang the Streamlit script thread indefinitely.
+    """
+
+    def __init__(self, inner: LLMBackend, caller: ResilientCaller = None):
+        self.inner = inner
+        self.name = inner.name
+        self.model_name = inner.model_name
+        self.caller = caller or ResilientCaller(
+            attempt_timeout=LLM_ATTEMPT_TIMEOUT_SECONDS,
+            deadline=LLM_DEADLINE_SECONDS,
+            max_attempts=LLM_MAX_ATTEMPTS,
+            hedge=LLM_HEDGE,
+            hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+            breaker=CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS),
+        )
+
+    def generate(self, prompt: str, cached_context: str = None, fast: bool = False,
+                 usage: dict = None) -> str:
+        return self.caller.call(lambda: self.inner.generate(prompt, cached_context, fast, usage))
+
+    def generate_stream(self, prompt: str, cached_context: str = None, fast: bool = False,
+                        usage: dict = None):
+        return self.caller.stream(lambda: self.inner.generate_stream(prompt, cached_context, fast, usage))
+
+    def create_cached_context(self, prefix: str, ttl_seconds: int, display_name: str = None) -> str:
+        # Not hedged: a duplicate request would register (and bill) a second cache
+        return self.caller.call(
+            lambda: self.inner.create_cached_context(prefix, ttl_seconds, display_name),
+            hedge=False,
+        )
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    if name == "gemini":
+        backend = GeminiBackend()
+    elif name == "local":
+        backend = LocalBackend()
+    else:
+        raise ValueError(f"Unknown LLM backend '{name}'. Use 'gemini' or 'local'.")
+    return ResilientBackend(backend) if LLM_RESILIENCE else backend
+
+
+def get_backend() -> LLMBackend:
+    """Returns the process-wide backend selected by LLM_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """Replaces the process-wide backend (used by benchmarks and load tests)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
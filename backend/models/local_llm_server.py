@@ -0,0 +1,151 @@
+"""
+Local stand-in for the LLM API, for offline load tests and benchmarks.
+
+Serves POST /v1/generate with {"prompt": str, "stream": bool} and answers
+with canned interviewer text after a configurable first-token latency,
+at a configurable token rate, optionally failing a fraction of requests.
+Streaming responses are newline-delimited JSON chunks.
+
+Run:
+    python -m backend.models.local_llm_server --port 8799 --latency-ms 400 \
+        --tokens-per-second 60 --failure-rate 0.02
+then start the app with LLM_BACKEND=local.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_QUESTIONS = [
+    "Thanks for sharing that. Can you walk me through a project where you had to make a difficult technical trade-off?",
+    "That makes sense. How did you measure whether your work had the impact you expected?",
+    "Interesting. Tell me about a time you disagreed with a teammate and how you resolved it.",
+    "Good. Which part of this role's responsibilities do you think will be the most challenging for you, and why?",
+    "Thank you. Can you describe how you would approach the first ninety days in this position?",
+]
+
+_NOTES = (
+    "Score: 7\n"
+    "Answer summary: The candidate described a relevant example with a clear outcome.\n"
+    "Strengths: Concrete details and a logical structure.\n"
+    "Improve: Quantify the impact and state the candidate's own contribution explicitly."
+)
+
+_FEEDBACK = (
+    "1. Overall Score: 7/10\n\n"
+    "2. Strengths: Clear, relevant examples and a structured delivery.\n\n"
+    "3. Areas for Improvement: Quantify results and tie answers back to the job description.\n\n"
+    "4. Detailed Answer-by-Answer Feedback: Answers were on topic; later answers were stronger.\n\n"
+    "5. Preparation Tips for the Real Interview: Practise STAR-format stories with measurable outcomes."
+)
+
+
+def canned_reply(prompt: str) -> str:
+    """Deterministic reply so identical prompts always get identical text."""
+    if "taking private notes" in prompt:
+        return _NOTES
+    if "feedback report" in prompt or "interview feedback" in prompt:
+        return _FEEDBACK
+    digest = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16)
+    return _QUESTIONS[digest % len(_QUESTIONS)]
+
+
+class StandInConfig:
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 100.0,
+                 tokens_per_second: float = 50.0, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+
+
+def _make_handler(config: StandInConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _write_chunk(self, payload: dict):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            if self.path != "/v1/generate":
+                self._send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = request.get("prompt", "")
+
+            # Time to first token
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            time.sleep(max(delay, 0.0) / 1000.0)
+
+            if random.random() < config.failure_rate:
+                self._send_json(503, {"error": "injected failure"})
+                return
+
+            words = canned_reply(prompt).split(" ")
+            per_token = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+            usage = {"prompt_tokens": len(prompt) // 4, "output_tokens": len(words)}
+
+            if not request.get("stream"):
+                time.sleep(per_token * len(words))
+                self._send_json(200, {"text": " ".join(words), "usage": usage})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(per_token)
+                self._write_chunk({"text": word if i == 0 else " " + word})
+            self._write_chunk({"text": "", "usage": usage})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 8799, config: StandInConfig = None):
+    """Starts the stand-in server on a daemon thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), _make_handler(config or StandInConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="local-llm").start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms, args.jitter_ms, args.tokens_per_second, args.failure_rate)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(config))
+    server.daemon_threads = True
+    print(f"Local LLM stand-in listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
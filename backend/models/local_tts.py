@@ -0,0 +1,72 @@
+"""
+Offline text-to-speech on the CPU with a VITS checkpoint from transformers.
+
+Selected with TTS_ENGINE=local (see audio_tts.speak_text). The model is
+downloaded and loaded once per process; later calls reuse it. Returns WAV
+bytes, so no API key or network access is needed after the first download.
+"""
+import io
+import os
+import threading
+
+import numpy as np
+import soundfile as sf
+import torch
+from transformers import AutoTokenizer, VitsModel
+
+# Any VITS checkpoint works, e.g. "kakao-enterprise/vits-vctk" for many voices
+LOCAL_TTS_MODEL = os.getenv("LOCAL_TTS_MODEL", "facebook/mms-tts-eng")
+# Speaker index for multi-speaker checkpoints (ignored by single-voice ones)
+LOCAL_TTS_SPEAKER = os.getenv("LOCAL_TTS_SPEAKER")
+LOCAL_TTS_SPEED = float(os.getenv("LOCAL_TTS_SPEED", "1.0"))
+
+# Short pause inserted between sentences, in seconds
+SENTENCE_PAUSE_SECONDS = 0.15
+
+_models = {}
+_load_lock = threading.Lock()
+# One forward pass at a time; torch already spreads each one over the CPU cores
+_synth_lock = threading.Lock()
+
+
+def load_model(model_name: str = LOCAL_TTS_MODEL):
+    """Loads (once per process) and returns (tokenizer, model) for a VITS checkpoint."""
+    with _load_lock:
+        if model_name not in _models:
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = VitsModel.from_pretrained(model_name)
+            model.eval()
+            _models[model_name] = (tokenizer, model)
+    return _models[model_name]
+
+
+def synthesize(text: str, sentences: list = None, model_name: str = LOCAL_TTS_MODEL,
+               speaker: int = None, speed: float = LOCAL_TTS_SPEED) -> bytes:
+    """
+    Synthesizes text and returns a 16-bit mono WAV. Sentences (if given) are
+    synthesized one by one and joined with a short pause, which keeps memory
+    flat on long replies. `speed` > 1 speaks faster.
+    """
+    if speaker is None and LOCAL_TTS_SPEAKER is not None:
+        speaker = int(LOCAL_TTS_SPEAKER)
+    tokenizer, model = load_model(model_name)
+    sampling_rate = model.config.sampling_rate
+    pause = np.zeros(int(SENTENCE_PAUSE_SECONDS * sampling_rate), dtype=np.float32)
+
+    pieces = []
+    with _synth_lock, torch.inference_mode():
+        model.speaking_rate = speed
+        for sentence in sentences or [text]:
+            inputs = tokenizer(sentence, return_tensors="pt")
+            if inputs["input_ids"].shape[-1] == 0:
+                continue
+            kwargs = {"speaker_id": speaker} if speaker is not None and model.config.num_speakers > 1 else {}
+            waveform = model(**inputs, **kwargs).waveform[0].numpy()
+            if pieces:
+                pieces.append(pause)
+            pieces.append(waveform.astype(np.float32))
+
+    buffer = io.BytesIO()
+    audio = np.concatenate(pieces) if pieces else pause
+    sf.write(buffer, audio, sampling_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE
+from backend.metrics import registry
+from backend.models import whisper_model
+
+try:
+    from faster_whisper import WhisperModel as FasterWhisperModel
+except ImportError:  # faster-whisper is optional (pip install faster-whisper)
+    FasterWhisperModel = None
+
+# Which engine voice answers go through:
+#   "whisper"        Whisper via transformers (WHISPER_MODEL, WHISPER_QUANTIZE)
+#   "whisper-int8"   the same checkpoint with int8 dynamic quantization
+#   "faster-whisper" CTranslate2 int8 inference on CPU (optional dependency)
+#   "google"         the legacy speech_recognition / Google Web Speech recognizer
+#   "fake"           deterministic offline transcripts, for benchmarks and load runs
+STT_ENGINE = os.getenv("STT_ENGINE", "whisper")
+# CTranslate2 weight type for faster-whisper: int8, int8_float32, float32
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+FASTER_WHISPER_THREADS = int(os.getenv("FASTER_WHISPER_THREADS", "0"))
+
+STT_ENGINES = ("whisper", "whisper-int8", "faster-whisper", "google", "fake")
+
+
+class STTEngine:
+    """
+    Interface every speech-to-text engine implements.
+
+    Engines take mono float32 waveforms at 16 kHz, as produced by
+    backend.audio_ingest, so decoding, resampling and silence trimming are
+    shared by all of them. Subclasses implement transcribe or
+    transcribe_batch (the default of each calls the other). `batched`
+    engines gain from decoding concurrent clips in one call and are fed by
+    the shared batching worker; the rest run clips independently.
+    `long_form` engines handle recordings beyond 30 s themselves, so they
+    skip overlapping windows. Engines are shared by all sessions in the
+    process and must be thread-safe.
+    """
+
+    name = "base"
+    model_name = ""
+    batched = False
+    long_form = False
+
+    @property
+    def label(self) -> str:
+        """Short name for metrics and cache keys; differs whenever transcripts can differ."""
+        return self.name
+
+    def load(self):
+        """Loads model weights ahead of the first transcription (no-op without a local model)."""
+
+    def transcribe(self, waveform: np.ndarray) -> str:
+        return self.transcribe_batch([waveform])[0]
+
+    def transcribe_batch(self, waveforms: list) -> list:
+        return [self.transcribe(waveform) for waveform in waveforms]
+
+
+class WhisperEngine(STTEngine):
+    """Whisper through transformers, optionally int8-quantized (see whisper_model.py)."""
+
+    name = "whisper"
+    batched = True
+
+    def __init__(self, size: str = None, quantize: bool = None):
+        self.size = size or whisper_model.WHISPER_MODEL
+        self.quantize = whisper_model.WHISPER_QUANTIZE if quantize is None else quantize
+        self.model_name = whisper_model.checkpoint_name(self.size)
+
+    @property
+    def label(self) -> str:
+        return whisper_model.model_label(self.size, self.quantize)
+
+    def load(self):
+        return whisper_model.load_whisper(self.size, self.quantize)
+
+    def transcribe_batch(self, waveforms: list) -> list:
+        return whisper_model.transcribe_batch(waveforms, *self.load())
+
+
+class FasterWhisperEngine(STTEngine):
+    """
+    The same Whisper checkpoints on CTranslate2 (faster-whisper): int8
+    weights and a fused CPU runtime, with its own long-form decoding.
+    """
+
+    name = "faster-whisper"
+    long_form = True
+
+    def __init__(self, size: str = None, compute_type: str = FASTER_WHISPER_COMPUTE_TYPE,
+                 cpu_threads: int = FASTER_WHISPER_THREADS):
+        self.size = size or whisper_model.WHISPER_MODEL
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.model_name = self.size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        return f"{self.size.split('/')[-1]}-ct2-{self.compute_type}"
+
+    def load(self):
+        if FasterWhisperModel is None:
+            raise ValueError("faster-whisper is not installed. Run `pip install faster-whisper` "
+                             "or choose another STT_ENGINE.")
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                self._model = FasterWhisperModel(self.size, device="cpu", compute_type=self.compute_type,
+                                                 cpu_threads=self.cpu_threads)
+                registry.set("stt_model_load_seconds", time.perf_counter() - started,
+                             help_text="Time to load a speech-to-text model", model=self.label)
+        return self._model
+
+    def transcribe(self, waveform: np.ndarray) -> str:
+        segments, _ = self.load().transcribe(waveform, beam_size=1)
+        # segments is a generator; decoding happens while it is consumed
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class GoogleRecognizerEngine(STTEngine):
+    """
+    The original recognizer (backend/audio.py): Google's Web Speech API via
+    speech_recognition. Needs network access; fed 16-bit PCM from memory.
+    """
+
+    name = "google"
+    model_name = "google-web-speech"
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+
+    def load(self):
+        # Imported here so the other engines don't need speech_recognition installed
+        try:
+            import speech_recognition
+        except ImportError:
+            raise ValueError("SpeechRecognition is not installed. Run `pip install SpeechRecognition` "
+                             "or choose another STT_ENGINE.") from None
+        return speech_recognition
+
+    def transcribe(self, waveform: np.ndarray) -> str:
+        sr = self.load()
+        pcm = (np.clip(waveform, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        audio = sr.AudioData(pcm, TARGET_SAMPLE_RATE, 2)
+        # Recognizer keeps per-call state, so each call gets its own
+        try:
+            return sr.Recognizer().recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return ""
+
+
+class FakeEngine(STTEngine):
+    """
+    Deterministic stand-in: the same waveform always yields the same words
+    (about 2.5 per second of audio, picked by a hash of the samples), and
+    `seconds_per_audio_second` optionally simulates model time.
+    """
+
+    name = "fake"
+    batched = True
+    WORDS = ("i", "worked", "on", "the", "team", "project", "data", "users", "we", "built",
+             "tested", "shipped", "a", "model", "pipeline", "and", "improved", "latency")
+
+    def __init__(self, seconds_per_audio_second: float = 0.0):
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def transcribe(self, waveform: np.ndarray) -> str:
+        audio_seconds = len(waveform) / TARGET_SAMPLE_RATE
+        if self.seconds_per_audio_second:
+            time.sleep(audio_seconds * self.seconds_per_audio_second)
+        digest = hashlib.sha256(np.ascontiguousarray(waveform, dtype=np.float32).tobytes()).digest()
+        count = int(audio_seconds * 2.5)
+        return " ".join(self.WORDS[digest[i % len(digest)] % len(self.WORDS)] for i in range(count))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def create_engine(name: str = STT_ENGINE) -> STTEngine:
+    if name == "whisper":
+        return WhisperEngine()
+    if name == "whisper-int8":
+        return WhisperEngine(quantize=True)
+    if name == "faster-whisper":
+        return FasterWhisperEngine()
+    if name == "google":
+        return GoogleRecognizerEngine()
+    if name == "fake":
+        return FakeEngine()
+    raise ValueError(f"Unknown STT engine '{name}'. Use one of: {', '.join(STT_ENGINES)}.")
+
+
+def get_engine() -> STTEngine:
+    """Returns the process-wide engine selected by STT_ENGINE."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine()
+    return _engine
+
+
+def set_engine(engine: STTEngine):
+    """Replaces the process-wide engine (used by benchmarks)."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
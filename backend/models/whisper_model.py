@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+import torch
+from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE
+from backend.metrics import registry
+
+# Checkpoint size: tiny (fastest), base, or small (most accurate, the default)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+# int8 dynamic quantization of the Linear layers (CPU only)
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "0") == "1"
+
+WHISPER_SIZES = ("tiny", "base", "small")
+
+_models = {}
+_load_lock = threading.Lock()
+
+
+def checkpoint_name(size: str) -> str:
+    """Maps a size (or a full Hugging Face id) to the checkpoint to load."""
+    if "/" in size:
+        return size
+    if size not in WHISPER_SIZES:
+        raise ValueError(f"Unknown Whisper model '{size}'. Use one of: {', '.join(WHISPER_SIZES)}.")
+    return f"openai/whisper-{size}"
+
+
+def model_label(size: str = None, quantize: bool = None) -> str:
+    """Short name for metrics and cache keys, e.g. 'small' or 'base-int8'."""
+    size = size or WHISPER_MODEL
+    quantize = WHISPER_QUANTIZE if quantize is None else quantize
+    return f"{size.split('/')[-1]}-int8" if quantize else size.split("/")[-1]
+
+
+def load_whisper(size: str = None, quantize: bool = None):
+    """
+    Loads the Whisper processor and model once per process and configuration.
+    With quantize, the model's Linear layers are converted to int8 with
+    dynamic activation quantization, which mostly speeds up the decoder on CPU.
+    Returns (processor, model).
+    """
+    size = size or WHISPER_MODEL
+    quantize = WHISPER_QUANTIZE if quantize is None else quantize
+    key = (checkpoint_name(size), quantize)
+    with _load_lock:
+        if key not in _models:
+            started = time.perf_counter()
+            processor = WhisperProcessor.from_pretrained(key[0])
+            model = WhisperForConditionalGeneration.from_pretrained(key[0])
+            model.config.forced_decoder_ids = None
+            model.eval()
+            if quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            registry.set("stt_model_load_seconds", time.perf_counter() - started,
+                         help_text="Time to load a speech-to-text model", model=model_label(size, quantize))
+            _models[key] = (processor, model)
+    return _models[key]
+
+
+def transcribe_batch(waveforms: list, processor, model) -> list:
+    """
+    Transcribes mono float32 waveforms at 16 kHz (see backend.audio_ingest)
+    with one batched generate call. Timing is recorded by the caller
+    (backend/transcription.py), the same way for every engine.
+    """
+    # The feature extractor pads every clip to Whisper's 30 s window, so clips batch as-is
+    inputs = processor(waveforms, sampling_rate=TARGET_SAMPLE_RATE, return_tensors="pt")
+    with torch.no_grad():
+        predicted_ids = model.generate(inputs.input_features)
+    return processor.batch_decode(predicted_ids, skip_special_tokens=True)
+
+
+def transcribe(waveform, processor, model) -> str:
+    """Transcribes one mono float32 waveform at 16 kHz (see transcribe_batch)."""
+    return transcribe_batch([waveform], processor, model)[0]
@@ -0,0 +1,269 @@
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+try:
+    from google.genai import errors as genai_errors
+except ImportError:  # google-genai is optional for the local backend
+    genai_errors = None
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_local = threading.local()
+
+
+@contextmanager
+def call_budget(attempt_timeout: float = None, deadline: float = None):
+    """
+    Overrides the per-attempt timeout and overall deadline of every
+    ResilientCaller call made by this thread inside the block, e.g. to give
+    a slow call type (the end-of-interview report) more time than a turn.
+    None keeps the caller's own setting.
+    """
+    previous = getattr(_local, "budget", None)
+    _local.budget = (attempt_timeout, deadline)
+    try:
+        yield
+    finally:
+        _local.budget = previous
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """The upstream API could not produce an answer in time or is degraded."""
+
+
+class DeadlineExceededError(UpstreamUnavailableError, TimeoutError):
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection problems, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, (TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    if genai_errors is not None and isinstance(error, genai_errors.APIError):
+        return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+    return False
+
+
+def is_cached_context_error(error: Exception) -> bool:
+    """
+    True when a call failed because of its cached context (e.g. the cache
+    expired or was evicted server-side), so resending the prefix inline can
+    help. Timeouts, an open circuit and upstream outages don't qualify.
+    """
+    if genai_errors is None or not isinstance(error, genai_errors.ClientError):
+        return False
+    return getattr(error, "code", None) in (400, 403, 404) and "cache" in str(error).lower()
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1):
+        """Returns the pct-th percentile, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream is degraded.
+
+    Opens after `failure_threshold` consecutive retryable failures, rejects
+    calls for `reset_seconds`, then lets a single trial call through
+    (half-open). A successful trial closes the circuit; a failed one reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                raise CircuitOpenError(
+                    "The AI service is temporarily unavailable. Please try again in a moment."
+                )
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls with a per-attempt timeout, an overall deadline,
+    jittered exponential retry on retryable errors, an optional hedged second
+    request once the first passes the recent p95 latency, and a circuit breaker.
+    """
+
+    def __init__(self, attempt_timeout: float = 30.0, deadline: float = 60.0, max_attempts: int = 3,
+                 hedge: bool = True, hedge_percentile: float = 95.0, hedge_min_samples: int = 20,
+                 breaker: CircuitBreaker = None, max_workers: int = 32):
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prepy-upstream")
+        self._stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.state
+        stats["p95_seconds"] = self.latency.percentile(95, self.hedge_min_samples)
+        return stats
+
+    def _attempt(self, fn, timeout: float, hedge: bool):
+        started = time.monotonic()
+        primary = self._executor.submit(fn)
+        futures = {primary}
+
+        hedge_after = self.latency.percentile(self.hedge_percentile, self.hedge_min_samples) if hedge else None
+        if hedge_after is not None and hedge_after < timeout:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                self._count("hedges")
+                futures.add(self._executor.submit(fn))
+
+        error = None
+        while futures:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    self.latency.record(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+
+        if futures:
+            self._count("timeouts")
+            raise DeadlineExceededError(f"No response from the AI service within {timeout:.1f}s.")
+        raise error
+
+    def call(self, fn, hedge: bool = None):
+        """
+        Calls fn() under the retry/hedge/deadline/breaker policy and returns its
+        result. Non-retryable errors (bad input, missing API key) propagate as-is.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        self._count("calls")
+        hedge = self.hedge if hedge is None else hedge
+        attempt_timeout, total = getattr(_local, "budget", None) or (None, None)
+        attempt_timeout = attempt_timeout or self.attempt_timeout
+        total = total or self.deadline
+        deadline = time.monotonic() + total
+
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.breaker.record_failure()
+                raise DeadlineExceededError(f"No response from the AI service within {total:.1f}s.")
+            try:
+                result = self._attempt(fn, min(attempt_timeout, remaining), hedge)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered (or was never reached); not a health signal
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_attempts - 1 or self.breaker.state == "open":
+                    if isinstance(e, UpstreamUnavailableError):
+                        raise
+                    raise UpstreamUnavailableError(
+                        f"The AI service is not responding ({type(e).__name__}). Please try again."
+                    ) from e
+                self._count("retries")
+                time.sleep(min(backoff_delay(attempt), max(deadline - time.monotonic(), 0)))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stream(self, make_iterator):
+        """
+        Streaming counterpart of call(). The policy covers the request up to
+        its first chunk, after which chunks are passed through unchanged.
+        Streams are never hedged, since the losing stream would stay open.
+        """
+        def first_chunk():
+            iterator = iter(make_iterator())
+            try:
+                return iterator, next(iterator)
+            except StopIteration:
+                return iterator, None
+
+        iterator, chunk = self.call(first_chunk, hedge=False)
+        if chunk is None:
+            return
+        yield chunk
+        yield from iterator
@@ -0,0 +1,173 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.metrics import registry
+from backend.resilience import UpstreamUnavailableError
+
+# Lower number = served first
+PRIORITY_TURN = 0        # the question the candidate is waiting for (text + voice)
+PRIORITY_FEEDBACK = 1    # end-of-interview reports (the candidate waits behind a spinner)
+PRIORITY_BACKGROUND = 2  # speculative or off-critical-path work (prefetch, answer notes)
+
+PRIORITY_NAMES = {
+    PRIORITY_TURN: "turn",
+    PRIORITY_FEEDBACK: "feedback",
+    PRIORITY_BACKGROUND: "background",
+}
+
+SCHEDULER_MAX_WAIT_SECONDS = float(os.getenv("SCHEDULER_MAX_WAIT_SECONDS", "60"))
+
+_local = threading.local()
+
+
+@contextmanager
+def priority(level: int):
+    """
+    Overrides the priority of every scheduled call made by this thread inside
+    the block, e.g. to demote a speculative prefetch to background priority.
+    """
+    previous = getattr(_local, "priority", None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def current_priority(default: int = PRIORITY_TURN) -> int:
+    """
+    Returns the priority override active on this thread, or default. Used to
+    carry the caller's priority over to work it hands to a thread pool.
+    """
+    override = getattr(_local, "priority", None)
+    return default if override is None else override
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until_token(self) -> float:
+        """Seconds until a token is available (0 if one is available now). Caller holds the lock."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self):
+        if self.rate > 0:
+            self._tokens -= 1
+
+
+class UpstreamScheduler:
+    """
+    Process-wide admission control for one upstream API, shared by every
+    Streamlit session. Limits concurrent calls and the request rate (token
+    bucket), and serves waiting calls by priority, first come first served
+    within a priority. Queue depth, active calls and wait time are exported
+    to the metrics registry.
+    """
+
+    def __init__(self, upstream: str, max_concurrent: int, rate_per_second: float, burst: float = None,
+                 max_wait_seconds: float = SCHEDULER_MAX_WAIT_SECONDS):
+        self.upstream = upstream
+        self.max_concurrent = max_concurrent
+        self.max_wait_seconds = max_wait_seconds
+        self._bucket = TokenBucket(rate_per_second, burst if burst is not None else max(rate_per_second, 1))
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._active = 0
+
+    def _publish(self):
+        registry.set("upstream_queue_depth", len(self._queue),
+                     help_text="Calls waiting for an upstream slot", upstream=self.upstream)
+        registry.set("upstream_active_calls", self._active,
+                     help_text="Calls currently holding an upstream slot", upstream=self.upstream)
+
+    def acquire(self, level: int = PRIORITY_TURN):
+        override = getattr(_local, "priority", None)
+        if override is not None:
+            level = override
+        started = time.monotonic()
+        deadline = started + self.max_wait_seconds
+        ticket = (level, next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            self._publish()
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        registry.inc("upstream_rejected_total", help_text="Calls that gave up waiting for a slot",
+                                     upstream=self.upstream, priority=PRIORITY_NAMES.get(level, str(level)))
+                        raise UpstreamUnavailableError(
+                            "The service is busy right now. Please try again in a moment."
+                        )
+                    if self._queue[0] == ticket and self._active < self.max_concurrent:
+                        wait_for_token = self._bucket.time_until_token()
+                        if wait_for_token <= 0:
+                            self._bucket.take()
+                            break
+                        self._cond.wait(min(wait_for_token, remaining))
+                    else:
+                        self._cond.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            self._active += 1
+            self._publish()
+
+        registry.observe("upstream_wait_seconds", time.monotonic() - started,
+                         help_text="Time spent queued before an upstream call",
+                         upstream=self.upstream, priority=PRIORITY_NAMES.get(level, str(level)))
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._publish()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, level: int = PRIORITY_TURN):
+        """Holds one upstream slot for the duration of the block."""
+        self.acquire(level)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"queued": len(self._queue), "active": self._active, "max_concurrent": self.max_concurrent}
+
+
+llm_scheduler = UpstreamScheduler(
+    "llm",
+    max_concurrent=int(os.getenv("LLM_MAX_CONCURRENT", "8")),
+    rate_per_second=float(os.getenv("LLM_RATE_PER_SECOND", "5")),
+)
+
+tts_scheduler = UpstreamScheduler(
+    "tts",
+    max_concurrent=int(os.getenv("TTS_MAX_CONCURRENT", "4")),
+    rate_per_second=float(os.getenv("TTS_RATE_PER_SECOND", "3")),
+)
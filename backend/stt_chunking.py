@@ -0,0 +1,84 @@
+import os
+import re
+
+import numpy as np
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE
+
+# Whisper sees at most 30 s per pass; longer answers are cut into overlapping windows
+MAX_SINGLE_PASS_SECONDS = 30.0
+WINDOW_SECONDS = float(os.getenv("STT_WINDOW_SECONDS", "28"))
+OVERLAP_SECONDS = float(os.getenv("STT_OVERLAP_SECONDS", "4"))
+
+# Shortest run of words that counts as the same speech heard in both windows
+MIN_OVERLAP_WORDS = 2
+# Fraction of the words in a candidate overlap that must agree
+OVERLAP_MATCH_RATIO = 0.8
+
+
+def window_bounds(samples: int, window_seconds: float = WINDOW_SECONDS,
+                  overlap_seconds: float = OVERLAP_SECONDS,
+                  sample_rate: int = TARGET_SAMPLE_RATE) -> list:
+    """
+    Returns (start, end) sample offsets of windows of window_seconds that
+    overlap by exactly overlap_seconds; the last window is left short
+    rather than shifted back, so every seam has the overlap the stitcher
+    expects. A recording Whisper can take in one pass (up to
+    MAX_SINGLE_PASS_SECONDS) is a single window.
+    """
+    window = int(window_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    step = window - overlap
+    if samples <= max(window, int(MAX_SINGLE_PASS_SECONDS * sample_rate)) or step <= 0:
+        return [(0, samples)]
+    # Each window after the first must add audio beyond the overlap
+    return [(start, min(start + window, samples)) for start in range(0, samples - overlap, step)]
+
+
+def split_windows(waveform: np.ndarray, window_seconds: float = WINDOW_SECONDS,
+                  overlap_seconds: float = OVERLAP_SECONDS,
+                  sample_rate: int = TARGET_SAMPLE_RATE) -> list:
+    """
+    Cuts a waveform into overlapping windows (see window_bounds). Returns
+    [waveform] unchanged when it fits in one Whisper pass.
+    """
+    bounds = window_bounds(len(waveform), window_seconds, overlap_seconds, sample_rate)
+    if len(bounds) == 1:
+        return [waveform]
+    return [waveform[start:end] for start, end in bounds]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^a-z0-9']", "", word.lower())
+
+
+def _overlap_length(left: list, right: list) -> int:
+    """
+    Number of leading words of `right` that repeat the end of `left`, found by
+    trying the longest candidate first and allowing a few misheard words.
+    """
+    for k in range(min(len(left), len(right)), MIN_OVERLAP_WORDS - 1, -1):
+        matches = sum(a == b for a, b in zip(left[-k:], right[:k]))
+        if matches >= OVERLAP_MATCH_RATIO * k:
+            return k
+    return 0
+
+
+def stitch_transcripts(texts: list, overlap_seconds: float = OVERLAP_SECONDS) -> str:
+    """
+    Joins transcripts of overlapping windows, dropping the words at the start
+    of each window that repeat the end of the previous one. The search is
+    limited to roughly what can be said in overlap_seconds.
+    """
+    max_words = max(MIN_OVERLAP_WORDS, int(overlap_seconds * 4))
+    merged = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+        if merged:
+            tail = [_normalize(w) for w in merged[-max_words:]]
+            head = [_normalize(w) for w in words[:max_words]]
+            words = words[_overlap_length(tail, head):]
+        merged.extend(words)
+    return " ".join(merged)
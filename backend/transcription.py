@@ -0,0 +1,270 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from backend import audio_ingest, stt_chunking
+from backend.audio_ingest import TARGET_SAMPLE_RATE, load_audio
+from backend.cache import CACHE_DIR, DiskCache, MemoryCache, content_hash
+from backend.metrics import registry
+from backend.models.stt_engine import STTEngine, get_engine
+from backend.stt_chunking import split_windows, stitch_transcripts
+
+logger = logging.getLogger(__name__)
+
+# The pipeline below is the same for every engine (backend/models/stt_engine.py);
+# the WHISPER_* names predate the other engines and are kept for existing setups.
+# Load the engine and run one dummy transcription in a background thread at startup
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "0") == "1"
+# Transcribe recordings from all sessions on one worker thread, batching concurrent ones
+WHISPER_BATCHING = os.getenv("WHISPER_BATCHING", "1") == "1"
+WHISPER_MAX_BATCH = int(os.getenv("WHISPER_MAX_BATCH", "8"))
+WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", "25"))
+# Threads that run engines which don't go through the batching worker
+STT_WORKERS = int(os.getenv("STT_WORKERS", "2"))
+
+# Transcripts by (recording bytes, engine and ingest settings), shared by all sessions
+# in the process through a bounded in-memory LRU.
+STT_CACHE_ENABLED = os.getenv("STT_CACHE", "1") == "1"
+# Optional second layer on disk that survives restarts. Opt-in, since transcripts
+# are candidates' answers; entries expire after STT_CACHE_TTL_SECONDS.
+STT_CACHE_DISK_ENABLED = STT_CACHE_ENABLED and os.getenv("STT_CACHE_DISK", "0") == "1"
+STT_CACHE_MAX_BYTES = int(os.getenv("STT_CACHE_MAX_MB", "16")) * 1024 * 1024
+stt_cache = MemoryCache(max_bytes=STT_CACHE_MAX_BYTES) if STT_CACHE_ENABLED else None
+stt_disk_cache = None
+if STT_CACHE_DISK_ENABLED:
+    stt_disk_cache = DiskCache(
+        os.path.join(CACHE_DIR, "stt_transcripts.sqlite"),
+        max_bytes=STT_CACHE_MAX_BYTES,
+        ttl_seconds=float(os.getenv("STT_CACHE_TTL_SECONDS", "3600")),
+    )
+
+_warmup_thread = None
+_warmup_status = {"state": "idle", "load_seconds": None, "warmup_seconds": None, "error": None}
+_warmup_lock = threading.Lock()
+
+
+def run_engine(engine: STTEngine, waveforms: list) -> list:
+    """
+    Transcribes 16 kHz mono waveforms with one engine call and records wall
+    time and real-time factor (processing seconds per audio second) under
+    the engine's label, so every engine is measured the same way.
+    """
+    started = time.perf_counter()
+    texts = engine.transcribe_batch(waveforms)
+    seconds = time.perf_counter() - started
+    audio_seconds = sum(len(w) for w in waveforms) / TARGET_SAMPLE_RATE
+    registry.observe("stt_seconds", seconds, help_text="Wall time per transcription", model=engine.label)
+    if audio_seconds > 0:
+        registry.observe("stt_real_time_factor", seconds / audio_seconds,
+                         help_text="Transcription time per second of audio",
+                         buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0), model=engine.label)
+    return texts
+
+
+class TranscriptionBatcher:
+    """
+    One worker thread that owns the model and serves every session. Callers
+    get a Future; the worker takes the first queued clip, waits up to
+    `max_wait_seconds` for more (up to `max_batch`), and transcribes them
+    with a single batched engine call. Without an explicit engine it
+    follows get_engine().
+    """
+
+    def __init__(self, engine: STTEngine = None, max_batch: int = WHISPER_MAX_BATCH,
+                 max_wait_seconds: float = WHISPER_BATCH_WAIT_MS / 1000.0):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="stt-batcher")
+        self._thread.start()
+
+    def submit(self, waveform) -> Future:
+        """Queues a 16 kHz mono waveform; the Future resolves to its transcript."""
+        future = Future()
+        self._queue.put((waveform, future))
+        registry.set("stt_queue_depth", self._queue.qsize(), help_text="Recordings waiting for transcription")
+        return future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(w, f) for w, f in self._collect() if f.set_running_or_notify_cancel()]
+            registry.set("stt_queue_depth", self._queue.qsize(), help_text="Recordings waiting for transcription")
+            if not batch:
+                continue
+            engine = self.engine or get_engine()
+            registry.observe("stt_batch_size", len(batch), help_text="Recordings per batched engine call",
+                             buckets=(1, 2, 4, 8, 16, 32), model=engine.label)
+            try:
+                texts = run_engine(engine, [w for w, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), text in zip(batch, texts):
+                future.set_result(text)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+_stt_executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt-worker")
+
+
+def get_batcher() -> TranscriptionBatcher:
+    """Returns the process-wide batcher (started on first use)."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = TranscriptionBatcher()
+    return _batcher
+
+
+def submit_transcription(waveform) -> Future:
+    """
+    Transcribes a waveform through the shared batching worker when the
+    engine batches and WHISPER_BATCHING=1, otherwise on the STT worker
+    pool. Either way it returns at once; the caller's thread never decodes.
+    """
+    engine = get_engine()
+    if WHISPER_BATCHING and engine.batched:
+        return get_batcher().submit(waveform)
+    return _stt_executor.submit(lambda: run_engine(engine, [waveform])[0])
+
+
+def transcribe_long(waveform) -> str:
+    """
+    Transcribes a recording of any length. Unless the engine decodes long
+    audio itself, answers longer than one Whisper window are cut into
+    overlapping windows (backend/stt_chunking.py), which are decoded in
+    parallel as one batch and stitched back together at the overlaps.
+    Shorter answers take the plain submit_transcription path.
+    """
+    engine = get_engine()
+    windows = [waveform] if engine.long_form else split_windows(waveform)
+    if len(windows) == 1:
+        return submit_transcription(waveform).result()
+    registry.observe("stt_windows", len(windows), help_text="Windows per long recording",
+                     buckets=(2, 3, 4, 6, 8, 12, 16))
+    if WHISPER_BATCHING and engine.batched:
+        futures = [submit_transcription(window) for window in windows]
+        texts = [future.result() for future in futures]
+    else:
+        texts = run_engine(engine, windows)
+    return stitch_transcripts(texts)
+
+
+def _transcript_key(data: bytes) -> str:
+    # Everything that can change the transcript of the same bytes
+    engine = get_engine()
+    return content_hash(
+        data,
+        engine.name,
+        engine.label,
+        audio_ingest.VAD_ENABLED,
+        audio_ingest.VAD_MAX_PAUSE_SECONDS,
+        stt_chunking.WINDOW_SECONDS,
+        stt_chunking.OVERLAP_SECONDS,
+    )
+
+
+def get_stt_cache_stats() -> dict:
+    """Returns hit/miss/eviction stats for the in-memory transcript cache (empty when disabled)."""
+    return stt_cache.stats() if stt_cache is not None else {}
+
+
+def _cache_get(key: str):
+    cached = stt_cache.get(key)
+    if cached is None and stt_disk_cache is not None:
+        cached = stt_disk_cache.get(key)
+        if cached is not None:
+            stt_cache.put(key, cached)
+    registry.inc("stt_cache_lookups_total", help_text="Transcript cache lookups by result",
+                 result="hit" if cached is not None else "miss")
+    return cached
+
+
+def _cache_put(key: str, value: bytes):
+    stt_cache.put(key, value)
+    if stt_disk_cache is not None:
+        stt_disk_cache.put(key, value)
+
+
+def transcribe_recording(data: bytes) -> str:
+    """
+    Transcribes an uploaded recording (any length) from its raw bytes. The
+    same bytes under the same engine and ingest settings are only ever
+    decoded once while cached: retried uploads and reruns hit the cache.
+    """
+    key = _transcript_key(data) if stt_cache is not None else None
+    if key is not None:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+    text = transcribe_long(load_audio(data))
+    if key is not None:
+        _cache_put(key, text.encode("utf-8"))
+    return text
+
+
+def _warm_up(engine: STTEngine):
+    label = engine.label
+    registry.set("stt_ready", 0, help_text="1 once the speech-to-text model is loaded and warmed up", model=label)
+    try:
+        started = time.perf_counter()
+        engine.load()
+        loaded = time.perf_counter()
+        # One second of silence exercises the whole model (for Whisper: feature extractor, encoder, decoder)
+        run_engine(engine, [np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32)])
+        warm = time.perf_counter()
+    except Exception as e:
+        with _warmup_lock:
+            _warmup_status.update(state="failed", error=str(e))
+        logger.warning("speech-to-text warm-up failed: %s", e)
+        return
+    registry.set("stt_warmup_seconds", warm - loaded,
+                 help_text="Time of the first (dummy) transcription after loading", model=label)
+    registry.set("stt_ready", 1, help_text="1 once the speech-to-text model is loaded and warmed up", model=label)
+    with _warmup_lock:
+        _warmup_status.update(state="ready", load_seconds=loaded - started, warmup_seconds=warm - loaded)
+
+
+def start_warmup(force: bool = False):
+    """
+    Starts loading and warming up the configured engine in a daemon thread,
+    once per process. No-op unless WHISPER_WARMUP=1 (or force). Safe to call
+    on every Streamlit rerun; a transcription that arrives meanwhile simply
+    waits for the load to finish instead of loading a second copy.
+    """
+    global _warmup_thread
+    if not (WHISPER_WARMUP or force):
+        return
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_status["state"] = "loading"
+        _warmup_thread = threading.Thread(target=_warm_up, args=(get_engine(),), daemon=True,
+                                          name="stt-warmup")
+        _warmup_thread.start()
+
+
+def warmup_status() -> dict:
+    """Returns {"state": idle|loading|ready|failed, "load_seconds", "warmup_seconds", "error"}."""
+    with _warmup_lock:
+        return dict(_warmup_status)
@@ -0,0 +1,88 @@
+"""
+Compares the in-memory audio ingest path (backend/audio_ingest.py) with the
+previous one (temp WAV file, float64 decode, librosa's default resampler),
+plus the cost and savings of silence trimming (voice activity detection).
+
+Uses synthetic speech-like recordings, so no microphone or model is needed:
+
+    python -m benchmarks.audio_ingest --seconds 5 30 --sample-rate 48000 --channels 2
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE, load_audio, trim_silence
+
+
+def synthetic_recording(seconds: float, sample_rate: int, channels: int, seed: int = 0) -> bytes:
+    """A WAV of amplitude-modulated harmonics plus noise, roughly shaped like speech (with pauses)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t)) * (np.sin(2 * np.pi * 0.2 * t) > -0.5)
+    mono = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    audio = np.stack([mono] * channels, axis=1)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def previous_ingest(data: bytes) -> np.ndarray:
+    """The original main.py path: temp file, sf.read, mean, librosa.resample."""
+    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    try:
+        tmp.write(data)
+        tmp.close()
+        waveform, sample_rate = sf.read(tmp.name)
+        if len(waveform.shape) > 1:
+            waveform = waveform.mean(axis=1)
+        return librosa.resample(waveform, orig_sr=sample_rate, target_sr=TARGET_SAMPLE_RATE)
+    finally:
+        os.unlink(tmp.name)
+
+
+def time_path(fn, data: bytes, repeats: int):
+    fn(data)  # warm up (librosa / scipy filter design caches)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn(data)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[5.0, 30.0, 120.0])
+    parser.add_argument("--sample-rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.sample_rate} Hz, {args.channels} channel(s) -> {TARGET_SAMPLE_RATE} Hz mono; "
+          f"median of {args.repeats} runs\n")
+    print(f"{'seconds':>8}{'previous ms':>14}{'in-memory ms':>15}{'speedup':>10}{'max abs diff':>15}"
+          f"{'vad ms':>9}{'vad saved s':>13}")
+    for seconds in args.seconds:
+        data = synthetic_recording(seconds, args.sample_rate, args.channels)
+        old_time, old_out = time_path(previous_ingest, data, args.repeats)
+        new_time, new_out = time_path(lambda d: load_audio(d, vad=False), data, args.repeats)
+        n = min(len(old_out), len(new_out))
+        diff = float(np.max(np.abs(old_out[:n] - new_out[:n]))) if n else 0.0
+        vad_time, trimmed = time_path(trim_silence, new_out, args.repeats)
+        saved = (len(new_out) - len(trimmed)) / TARGET_SAMPLE_RATE
+        print(f"{seconds:>8.1f}{old_time * 1000:>14.1f}{new_time * 1000:>15.1f}"
+              f"{old_time / new_time:>9.1f}x{diff:>15.4f}{vad_time * 1000:>9.1f}{saved:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Long-answer transcription: times synthetic recordings of several minutes
+(bundled samples joined with short pauses) three ways:
+
+  single      one engine call, the previous behaviour (Whisper truncates at 30 s)
+  sequential  overlapping windows decoded one after another, then stitched
+  windowed    the app's path (transcription.transcribe_long): overlapping windows
+              decoded as one batch, or one call for engines that decode long audio
+
+Windowing and stitching themselves are covered offline by tests/test_stt_chunking.py.
+
+    python -m benchmarks.long_transcription --minutes 1 2 3 --engine whisper --model base
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend import transcription
+from backend.audio_ingest import TARGET_SAMPLE_RATE
+from backend.models import whisper_model
+from backend.models.stt_engine import STT_ENGINE, STT_ENGINES, create_engine, set_engine
+from backend.stt_chunking import OVERLAP_SECONDS, WINDOW_SECONDS, split_windows, stitch_transcripts
+from benchmarks.stt_models import bundled_samples, word_error_rate
+
+PAUSE_SECONDS = 0.4
+
+
+def long_recording(samples: list, minutes: float):
+    """Repeats the bundled samples (with pauses) until the recording is `minutes` long."""
+    pause = np.zeros(int(PAUSE_SECONDS * TARGET_SAMPLE_RATE), dtype=np.float32)
+    pieces, texts, total = [], [], 0
+    target = int(minutes * 60 * TARGET_SAMPLE_RATE)
+    while total < target:
+        for _, text, waveform in samples:
+            pieces.extend([waveform, pause])
+            texts.append(text)
+            total += len(waveform) + len(pause)
+            if total >= target:
+                break
+    return np.concatenate(pieces), " ".join(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 2.0, 3.0])
+    parser.add_argument("--engine", choices=STT_ENGINES, default=STT_ENGINE)
+    parser.add_argument("--model", default=whisper_model.WHISPER_MODEL, help="tiny, base or small (Whisper engines)")
+    args = parser.parse_args()
+
+    whisper_model.WHISPER_MODEL = args.model
+    engine = create_engine(args.engine)
+    set_engine(engine)
+    engine.load()
+    samples = bundled_samples()
+    engine.transcribe(samples[0][2])  # warm up
+
+    def sequential(waveform):
+        return stitch_transcripts([engine.transcribe(w) for w in split_windows(waveform)])
+
+    modes = [("single", engine.transcribe), ("sequential", sequential), ("windowed", transcription.transcribe_long)]
+
+    print(f"\n{engine.name} ({engine.label}), windows of {WINDOW_SECONDS:.0f}s "
+          f"overlapping by {OVERLAP_SECONDS:.0f}s\n")
+    print(f"{'audio s':>8}{'windows':>9}  {'mode':<12}{'seconds':>9}{'RTF':>8}{'WER %':>8}")
+    for minutes in args.minutes:
+        waveform, reference = long_recording(samples, minutes)
+        audio_seconds = len(waveform) / TARGET_SAMPLE_RATE
+        windows = len(split_windows(waveform))
+        for name, fn in modes:
+            start = time.perf_counter()
+            hypothesis = fn(waveform)
+            seconds = time.perf_counter() - start
+            print(f"{audio_seconds:>8.1f}{windows:>9}  {name:<12}{seconds:>9.2f}"
+                  f"{seconds / audio_seconds:>8.3f}{word_error_rate(reference, hypothesis) * 100:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
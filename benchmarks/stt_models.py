@@ -0,0 +1,163 @@
+"""
+Real-time factor and word error rate of each speech-to-text engine
+(backend/models/stt_engine.py) on the bundled sample set
+(benchmarks/data/stt_samples.jsonl). Whisper runs once per size, with and
+without int8 quantization; faster-whisper once per size; the google and
+fake engines once. Engines that cannot load (e.g. faster-whisper not
+installed) are reported and skipped.
+
+The bundled set ships transcripts only; their audio is synthesized once with
+the offline TTS engine (backend/models/local_tts.py) and cached under
+PREPY_CACHE_DIR. Pass --samples-dir with <id>.wav + <id>.txt pairs to use
+real recordings instead.
+
+    python -m benchmarks.stt_models --engines whisper faster-whisper --models tiny base small --quantize both
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE, load_audio
+from backend.cache import CACHE_DIR
+from backend.models import whisper_model
+from backend.models.stt_engine import STT_ENGINES, FasterWhisperEngine, WhisperEngine, create_engine
+
+SAMPLES_FILE = os.path.join(os.path.dirname(__file__), "data", "stt_samples.jsonl")
+
+
+def normalize(text: str) -> list:
+    """Lowercases, drops punctuation and splits into words."""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words, by word-level edit distance."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,                             # deletion
+                current[j - 1] + 1,                          # insertion
+                previous[j - 1] + (ref_word != hyp_word),    # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def bundled_samples() -> list:
+    """Returns [(id, reference text, 16 kHz waveform)], synthesizing missing audio once."""
+    from backend.models import local_tts
+
+    cache_dir = os.path.join(CACHE_DIR, "stt_samples")
+    os.makedirs(cache_dir, exist_ok=True)
+    samples = []
+    with open(SAMPLES_FILE, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            path = os.path.join(cache_dir, f"{entry['id']}.wav")
+            if not os.path.exists(path):
+                with open(path, "wb") as out:
+                    out.write(local_tts.synthesize(entry["text"]))
+            with open(path, "rb") as audio:
+                samples.append((entry["id"], entry["text"], load_audio(audio.read())))
+    return samples
+
+
+def directory_samples(directory: str) -> list:
+    """Returns [(id, reference text, 16 kHz waveform)] for every <id>.wav with an <id>.txt next to it."""
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        transcript = os.path.join(directory, stem + ".txt")
+        if ext.lower() not in (".wav", ".flac", ".ogg") or not os.path.exists(transcript):
+            continue
+        with open(transcript, encoding="utf-8") as f:
+            reference = f.read().strip()
+        with open(os.path.join(directory, name), "rb") as audio:
+            samples.append((stem, reference, load_audio(audio.read())))
+    return samples
+
+
+def evaluate(name: str, transcribe, samples: list) -> dict:
+    """
+    Runs transcribe(waveform) -> text over the samples (after one warm-up call)
+    and returns {"name", "rtf", "wer", "seconds"}: total processing time per
+    second of audio, word error rate over all words, and median seconds per sample.
+    """
+    transcribe(samples[0][2])
+    times, errors, words, audio_seconds = [], 0.0, 0, 0.0
+    for _, reference, waveform in samples:
+        start = time.perf_counter()
+        hypothesis = transcribe(waveform)
+        times.append(time.perf_counter() - start)
+        n = len(normalize(reference))
+        errors += word_error_rate(reference, hypothesis) * n
+        words += n
+        audio_seconds += len(waveform) / TARGET_SAMPLE_RATE
+    return {
+        "name": name,
+        "rtf": sum(times) / audio_seconds if audio_seconds else 0.0,
+        "wer": errors / words if words else 0.0,
+        "seconds": statistics.median(times),
+    }
+
+
+def print_results(results: list, samples: list):
+    audio_seconds = sum(len(s[2]) for s in samples) / TARGET_SAMPLE_RATE
+    print(f"\n{len(samples)} samples, {audio_seconds:.1f}s of audio\n")
+    print(f"{'engine':<28}{'RTF':>8}{'WER %':>8}{'median s':>10}")
+    for r in results:
+        print(f"{r['name']:<28}{r['rtf']:>8.3f}{r['wer'] * 100:>8.1f}{r['seconds']:>10.2f}")
+
+
+def engines(names: list, sizes: list, quantize_variants: list) -> list:
+    """Expands engine names into configured engines, one per size / quantization for the Whisper ones."""
+    result = []
+    for name in names:
+        if name == "whisper":
+            result.extend(WhisperEngine(size, quantize) for size in sizes for quantize in quantize_variants)
+        elif name == "whisper-int8":
+            result.extend(WhisperEngine(size, True) for size in sizes)
+        elif name == "faster-whisper":
+            result.extend(FasterWhisperEngine(size) for size in sizes)
+        else:
+            result.append(create_engine(name))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=STT_ENGINES, default=["whisper", "faster-whisper"])
+    parser.add_argument("--models", nargs="+", default=list(whisper_model.WHISPER_SIZES))
+    parser.add_argument("--quantize", choices=["no", "yes", "both"], default="both",
+                        help="Whisper (transformers) variants to run")
+    parser.add_argument("--samples-dir", help="directory of <id>.wav + <id>.txt recordings")
+    args = parser.parse_args()
+
+    samples = directory_samples(args.samples_dir) if args.samples_dir else bundled_samples()
+    if not samples:
+        parser.error("no samples found")
+    variants = {"no": [False], "yes": [True], "both": [False, True]}[args.quantize]
+
+    results = []
+    for engine in engines(args.engines, args.models, variants):
+        name = f"{engine.name} ({engine.label})" if engine.label != engine.name else engine.name
+        try:
+            engine.load()
+        except Exception as e:
+            print(f"skipping {name}: {e}")
+            continue
+        results.append(evaluate(name, engine.transcribe, samples))
+    print_results(results, samples)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Offline load test of the interview turn pipeline against the local LLM stand-in.
+
+Simulates concurrent interviews (first question, streamed follow-ups, per-answer
+evaluation, final report) without touching the real API and prints latency
+percentiles per stage.
+
+    python -m benchmarks.turn_pipeline --sessions 8 --turns 5 --latency-ms 300
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.metrics import registry
+from backend.models import gemini_model
+from backend.models.llm_backend import LocalBackend, set_backend
+from backend.models.local_llm_server import StandInConfig, start_server
+
+JOB_DESCRIPTION = "Data analyst. SQL, Python, dashboards, stakeholder communication. " * 10
+RESUME = "Analyst at a retail company. Built churn dashboards in Python and SQL. " * 15
+ANSWER = "In my last role I automated a weekly report, which saved the team about four hours a week. " * 3
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_session(turns, timings):
+    conversation = []
+    start = time.perf_counter()
+    question = gemini_model.interview_response(JOB_DESCRIPTION, RESUME, [], "Start the interview.")
+    timings["first_question"].append(time.perf_counter() - start)
+    conversation.append({"interviewer": question, "candidate": ""})
+
+    notes = []
+    for _ in range(turns):
+        conversation[-1]["candidate"] = ANSWER
+        start = time.perf_counter()
+        first_chunk_at = None
+        parts = []
+        for chunk in gemini_model.interview_response_stream(JOB_DESCRIPTION, RESUME, conversation, ANSWER):
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            parts.append(chunk)
+        end = time.perf_counter()
+        timings["follow_up_first_token"].append((first_chunk_at or end) - start)
+        timings["follow_up_total"].append(end - start)
+
+        start = time.perf_counter()
+        notes.append(gemini_model.evaluate_answer(JOB_DESCRIPTION, conversation[-1]["interviewer"], ANSWER))
+        timings["answer_notes"].append(time.perf_counter() - start)
+        conversation.append({"interviewer": "".join(parts), "candidate": ""})
+
+    start = time.perf_counter()
+    gemini_model.feedback_from_notes(JOB_DESCRIPTION, RESUME, conversation, notes)
+    timings["feedback"].append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent interviews")
+    parser.add_argument("--turns", type=int, default=5, help="answers per interview")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--metrics", choices=["prometheus", "jsonl"], help="also dump the metrics registry")
+    args = parser.parse_args()
+
+    server = start_server(port=args.port, config=StandInConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+    ))
+    set_backend(LocalBackend(base_url=f"http://127.0.0.1:{args.port}"))
+
+    timings = {
+        "first_question": [],
+        "follow_up_first_token": [],
+        "follow_up_total": [],
+        "answer_notes": [],
+        "feedback": [],
+    }
+    errors = 0
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [pool.submit(run_session, args.turns, timings) for _ in range(args.sessions)]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors += 1
+                print(f"session failed: {e}")
+    wall = time.perf_counter() - wall_start
+    server.shutdown()
+
+    print(f"\n{args.sessions} sessions x {args.turns} turns in {wall:.2f}s ({errors} failed sessions)\n")
+    print(f"{'stage':<24}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for stage, values in timings.items():
+        if not values:
+            continue
+        print(f"{stage:<24}{len(values):>6}"
+              f"{percentile(values, 50) * 1000:>10.1f}"
+              f"{percentile(values, 95) * 1000:>10.1f}"
+              f"{percentile(values, 99) * 1000:>10.1f}"
+              f"{statistics.mean(values) * 1000:>10.1f}")
+
+    if args.metrics == "prometheus":
+        print("\n" + registry.to_prometheus())
+    elif args.metrics == "jsonl":
+        print("\n" + registry.to_json_lines())
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,7 @@
   resume_pdf_bytes    → bytes: raw PDF for rendering/download
   feedback            → str or None: AI-generated feedback after interview ends
   last_tts_audio      → bytes or None: most recent TTS audio to play
+  last_tts_format     → str or None: output format last_tts_audio was synthesized in
   tts_played_for_turn → int: tracks which turn's TTS has been played (avoids replays)
   processed_audio_hash→ str or None: MD5 hash of last processed voice recording
   interviewer_name    → str: configurable name for the AI interviewer
@@ -48,6 +49,15 @@
   show_material       → str or None: "resume" or "jd" toggle for viewing materials
   auto_send_voice     → bool: whether to auto-send after voice transcription
   interview_session_id→ int: unique ID per session (used for input key uniqueness)
+  stream_replies      → bool: whether interviewer replies are streamed into the chat
+  prefetch            → dict or None: {"key", "future", "output_format"} for the
+                        speculatively generated first question + TTS of the current inputs
+  answer_notes        → dict: turn index → Future of that answer's background evaluation notes
+  tts_jobs            → dict: turn index → (Future of that question's TTS audio, output format),
+                        until it lands in last_tts_audio
+  tts_profile         → str: voice quality profile (output format / bitrate) for this session
+  live_transcription  → LiveTranscription or None: the live-voice recording being transcribed
+                        segment by segment while the candidate speaks
 =============================================================================
 """
 
@@ -55,28 +65,53 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import hashlib
+import logging
 import os
-import tempfile
-import torch
-import soundfile as sf
-import librosa
+from concurrent.futures import wait
 import pypdfium2 as pdfium
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
+from dotenv import load_dotenv
+
+# Read .env (GOOGLE_API_KEY, ELEVENLABS_API_KEY, settings) before the backend
+# modules import, since they read their settings from the environment at import
+load_dotenv()
 
 # Backend modules
-from backend.models.gemini_model import interview_response, interview_feedback
+from backend.background import submit_background, submit_turn
+from backend.live_transcription import LiveTranscription
+from backend.cache import content_hash
+from backend.metrics import registry, start_metrics_server
+from backend.resilience import UpstreamUnavailableError
+from backend.scheduler import PRIORITY_BACKGROUND, priority
+from backend.models.gemini_model import (
+    interview_response,
+    interview_response_stream,
+    interview_feedback,
+    evaluate_answer,
+    feedback_from_notes,
+)
 from backend.pdf_reader import extract_text_from_pdf
-from backend.models.audio_tts_old import speak_text
+from backend.models.stt_engine import get_engine
+from backend.transcription import start_warmup, transcribe_recording, warmup_status
+from backend.models.audio_tts import (
+    speak_text,
+    audio_mime_type,
+    output_format_for,
+    TTS_PROFILE,
+    TTS_PROFILES,
+)
 
 # Styling: CSS templates, HTML snippets, and home page content
 from styles import (
     GLOBAL_CSS,
     CHAT_HTML_TEMPLATE,
+    STREAMING_BUBBLE_HTML,
     HERO_HTML,
     SIDEBAR_HEADER_HTML,
     HOME_PAGE_HTML,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # ─── PAGE CONFIG ────────────────────────────────────────────────────────────
 # Must be the first Streamlit command. Sets browser tab title, icon, and layout.
@@ -89,6 +124,12 @@ st.set_page_config(
 # Inject global CSS (fonts, sidebar styling, buttons, inputs, etc.)
 st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
 
+# Expose model call metrics on METRICS_PORT (started once per process)
+start_metrics_server()
+
+# Load and warm up the STT engine in the background when WHISPER_WARMUP=1 (once per process)
+start_warmup()
+
 
 # ─── SESSION STATE INITIALIZATION ───────────────────────────────────────────
 # Each key is initialized only once per session. This block runs on every
@@ -118,6 +159,9 @@ if "feedback" not in st.session_state:
 if "last_tts_audio" not in st.session_state:
     st.session_state.last_tts_audio = None          # Latest TTS audio bytes
 
+if "last_tts_format" not in st.session_state:
+    st.session_state.last_tts_format = None         # Output format of last_tts_audio
+
 if "tts_played_for_turn" not in st.session_state:
     st.session_state.tts_played_for_turn = -1       # Which turn's audio was played
 
@@ -139,6 +183,43 @@ if "auto_send_voice" not in st.session_state:
 if "interview_session_id" not in st.session_state:
     st.session_state.interview_session_id = 0       # Unique ID for input key cycling
 
+if "stream_replies" not in st.session_state:
+    st.session_state.stream_replies = True          # Stream interviewer replies as they arrive
+
+if "prefetch" not in st.session_state:
+    st.session_state.prefetch = None                # Speculative first question for current inputs
+
+if "answer_notes" not in st.session_state:
+    st.session_state.answer_notes = {}              # Background per-answer evaluations
+
+if "tts_jobs" not in st.session_state:
+    st.session_state.tts_jobs = {}                  # Background TTS per turn
+
+if "tts_profile" not in st.session_state:
+    st.session_state.tts_profile = TTS_PROFILE      # Voice output format / bitrate
+
+if "live_transcription" not in st.session_state:
+    st.session_state.live_transcription = None      # Live-voice recording in progress
+
+# Generate the first question in the background as soon as JD + resume exist
+PREFETCH_FIRST_QUESTION = os.getenv("PREFETCH_FIRST_QUESTION", "1") == "1"
+
+# Evaluate each answer in the background; the final report reads the notes with the transcript
+INCREMENTAL_FEEDBACK = os.getenv("INCREMENTAL_FEEDBACK", "1") == "1"
+NOTES_WAIT_SECONDS = float(os.getenv("NOTES_WAIT_SECONDS", "3"))
+
+# How often the page checks whether a question's audio has arrived
+TTS_POLL_SECONDS = float(os.getenv("TTS_POLL_SECONDS", "0.5"))
+
+# Live voice mode: seconds of speech per segment sent by the browser
+LIVE_SEGMENT_SECONDS = float(os.getenv("LIVE_SEGMENT_SECONDS", "6"))
+
+# Browser-side recorder for live voice mode (static HTML/JS, no build step)
+live_recorder = components.declare_component(
+    "live_recorder",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "live_recorder"),
+)
+
 
 # ─── HELPER FUNCTIONS ──────────────────────────────────────────────────────
 
@@ -248,28 +329,221 @@ def render_chat(conversation, interviewer_name):
     components.html(full_html, height=estimated_height, scrolling=True)
 
 
+def stream_reply(chunks, slot, interviewer_name, q_num):
+    """
+    Renders an interviewer reply into a placeholder while it is still being
+    generated. Each chunk from the streaming API re-renders the partial bubble,
+    so the candidate sees the first words instead of a spinner.
+    Returns the full reply text once the stream is exhausted.
+    """
+    parts = []
+    interviewer_initial = interviewer_name[0].upper() if interviewer_name else "I"
+    for chunk in chunks:
+        parts.append(chunk)
+        slot.markdown(
+            STREAMING_BUBBLE_HTML.format(
+                initial=_escape_html(interviewer_initial),
+                name=_escape_html(interviewer_name),
+                q_num=q_num,
+                message=_md_to_html("".join(parts)).replace('\n', '<br>'),
+            ),
+            unsafe_allow_html=True
+        )
+    return "".join(parts).strip()
+
+
+def generate_reply(job_description, resume_text, conversation, user_input, interviewer_name, reply_slot=None):
+    """
+    Gets the next interviewer message from Gemini.
+    When streaming is enabled and a placeholder is given, the reply is rendered
+    token by token into that placeholder; otherwise it blocks for the full reply.
+    """
+    if st.session_state.stream_replies and reply_slot is not None:
+        chunks = interview_response_stream(
+            job_description,
+            resume_text,
+            conversation,
+            user_input,
+            interviewer_name=interviewer_name
+        )
+        return stream_reply(chunks, reply_slot, interviewer_name, len(conversation) + 1)
+    return interview_response(
+        job_description,
+        resume_text,
+        conversation,
+        user_input,
+        interviewer_name=interviewer_name
+    )
+
+
+def _speak_at_background_priority(text, output_format):
+    with priority(PRIORITY_BACKGROUND):
+        return speak_text(text, output_format=output_format)
+
+
+def _prefetch_first_turn(job_description, resume_text, interviewer_name, output_format):
+    """
+    Background task: generates the first interview question and starts its
+    TTS audio. Runs off the script thread, so it returns everything instead of
+    writing to session_state. Returns (question, Future of the audio bytes).
+    Speculative, so it queues behind live interview turns in the schedulers.
+    """
+    with priority(PRIORITY_BACKGROUND):
+        question = interview_response(
+            job_description,
+            resume_text,
+            [],
+            "Start the interview.",
+            interviewer_name=interviewer_name
+        )
+    return question, submit_background(_speak_at_background_priority, question, output_format)
+
+
+def schedule_first_turn_prefetch(job_description, resume_text, interviewer_name):
+    """
+    Starts generating the first question for the current inputs, keyed by their
+    content hash. A prefetch for older inputs is dropped when they change.
+    """
+    output_format = output_format_for(st.session_state.tts_profile)
+    key = content_hash(job_description, resume_text, interviewer_name, output_format)
+    current = st.session_state.prefetch
+    if current and current["key"] == key:
+        return
+    if current:
+        current["future"].cancel()
+    st.session_state.prefetch = {
+        "key": key,
+        "future": submit_background(
+            _prefetch_first_turn, job_description, resume_text, interviewer_name, output_format
+        ),
+        "output_format": output_format,
+    }
+
+
+def take_prefetched_first_turn(job_description, resume_text, interviewer_name):
+    """
+    Returns the prefetched (question, audio Future, output format) if it was
+    made for exactly these inputs, waiting for it if still running. Returns
+    None if there is no matching prefetch or it failed; the caller then
+    generates inline.
+    """
+    current = st.session_state.prefetch
+    st.session_state.prefetch = None
+    output_format = output_format_for(st.session_state.tts_profile)
+    if not current or current["key"] != content_hash(job_description, resume_text, interviewer_name, output_format):
+        return None
+    try:
+        question, audio_job = current["future"].result()
+        return question, audio_job, current["output_format"]
+    except Exception as e:
+        logger.warning("first question prefetch failed: %s", e)
+        return None
+
+
+def schedule_turn_audio(turn_index, text, job=None, output_format=None):
+    """
+    Synthesizes a question's voice off the script thread, keyed by its turn
+    index, so the question text can be shown right away. `job` is an already
+    running Future for the audio (e.g. from the first-question prefetch) made
+    in `output_format`. The format is kept with the job, so the player uses
+    the clip's own MIME type even if the session's profile changes meanwhile.
+    It runs on the turn pool, not behind other sessions' background work.
+    The audio player picks the result up in turn_audio_poller.
+    """
+    st.session_state.last_tts_audio = None
+    st.session_state.last_tts_format = None
+    if job is None:
+        output_format = output_format_for(st.session_state.tts_profile)
+        job = submit_turn(speak_text, text, output_format=output_format)
+    st.session_state.tts_jobs = {turn_index: (job, output_format)}
+
+
+@st.fragment(run_every=TTS_POLL_SECONDS)
+def turn_audio_poller(turn_index):
+    """
+    Polls the background TTS job for this turn without rerunning the page.
+    Once the audio has arrived (or failed) it is moved into last_tts_audio and
+    the whole page reruns once, so the player below attaches and autoplays.
+    """
+    job, output_format = st.session_state.tts_jobs.get(turn_index, (None, None))
+    if job is None or not job.done():
+        return
+    st.session_state.tts_jobs.pop(turn_index, None)
+    try:
+        st.session_state.last_tts_audio = job.result()
+        st.session_state.last_tts_format = output_format
+    except Exception as tts_err:
+        st.session_state.last_tts_audio = None
+        st.toast(f"Voice unavailable: {tts_err}")
+    st.rerun()
+
+
+def _finished_result(job):
+    """Returns a background job's result if it already succeeded, else None."""
+    if job is None or not job.done() or job.cancelled() or job.exception() is not None:
+        return None
+    return job.result()
+
+
+def build_feedback_report():
+    """
+    Produces the final performance report.
+
+    With INCREMENTAL_FEEDBACK, the report is built from the background
+    evaluation notes plus bounded answer excerpts. Notes still running are
+    waited for at most NOTES_WAIT_SECONDS in total; answers whose notes
+    are missing or failed go in without notes. If no notes are available
+    at all, the report is built from the full transcript.
+    """
+    conversation = st.session_state.conversation
+    answered = [i for i, turn in enumerate(conversation) if turn["candidate"]]
+    pending = st.session_state.answer_notes
+
+    if INCREMENTAL_FEEDBACK and answered:
+        jobs = [pending.get(i) for i in answered]
+        wait([job for job in jobs if job is not None], timeout=NOTES_WAIT_SECONDS)
+        notes = [_finished_result(job) for job in jobs]
+        if any(notes):
+            return feedback_from_notes(
+                st.session_state.job_description,
+                st.session_state.resume_text,
+                conversation,
+                notes,
+            )
+        registry.inc("feedback_notes_fallback_total",
+                     help_text="Reports built from the transcript alone because no answer notes were ready")
+        logger.warning("no answer notes ready, building the report from the transcript")
+
+    return interview_feedback(
+        st.session_state.job_description,
+        st.session_state.resume_text,
+        conversation,
+    )
+
+
 @st.cache_resource
-def load_whisper():
+def load_stt_engine():
     """
-    Loads the Whisper speech-to-text model (small variant).
+    Loads the speech-to-text engine selected by STT_ENGINE (Whisper by
+    default: WHISPER_MODEL tiny / base / small, int8 when WHISPER_QUANTIZE=1).
     Cached with @st.cache_resource so it only downloads/loads once per session.
-    Returns the processor (tokenizer) and the model.
+    Returns the engine.
     """
-    processor = WhisperProcessor.from_pretrained("openai/whisper-small")
-    model = WhisperForConditionalGeneration.from_pretrained("openai/whisper-small")
-    model.config.forced_decoder_ids = None
-    return processor, model
+    engine = get_engine()
+    engine.load()
+    return engine
 
 
-def send_answer(answer_text):
+def send_answer(answer_text, reply_slot=None):
     """
     Sends the candidate's answer to the AI interviewer and gets the next question.
 
     Steps:
       1. Saves the answer into the current conversation turn
       2. Calls Gemini to generate the next interviewer question
-      3. Generates TTS audio for the new question
-      4. Appends a new conversation turn for the next question
+         (streamed into reply_slot when streaming is enabled)
+      3. Appends a new conversation turn for the next question
+      4. Starts its TTS audio in the background (the player attaches later)
       5. Reruns Streamlit to update the UI
     """
     iname = st.session_state.interviewer_name
@@ -278,42 +552,87 @@ def send_answer(answer_text):
         st.warning("No interview in progress.")
         return
 
-    print(f"[DEBUG send_answer] Candidate answer ({len(answer_text)} chars): {answer_text[:200]}")
-    print(f"[DEBUG send_answer] Conversation turns so far: {len(st.session_state.conversation)}")
+    logger.debug("send_answer: answer of %d chars, %d turns so far",
+                 len(answer_text), len(st.session_state.conversation))
 
     # Save the candidate's answer to the current (last) turn
     st.session_state.conversation[-1]["candidate"] = answer_text
 
+    # Score this answer in the background so the final report starts from its notes
+    if INCREMENTAL_FEEDBACK:
+        st.session_state.answer_notes[len(st.session_state.conversation) - 1] = submit_background(
+            evaluate_answer,
+            st.session_state.job_description,
+            st.session_state.conversation[-1]["interviewer"],
+            answer_text
+        )
+
     # Get the next question from Gemini AI
-    next_resp = interview_response(
+    next_resp = generate_reply(
         st.session_state.job_description,
         st.session_state.resume_text,
         st.session_state.conversation,
         answer_text,
-        interviewer_name=iname
+        iname,
+        reply_slot=reply_slot
     )
 
-    # Generate text-to-speech audio for the new question
-    try:
-        tts_bytes = speak_text(next_resp)
-        st.session_state.last_tts_audio = tts_bytes
-    except Exception as tts_err:
-        st.session_state.last_tts_audio = None
-        st.warning(f"Voice unavailable: {tts_err}")
-
     # Add a new turn for the next question (candidate answer is empty until they respond)
     st.session_state.conversation.append({
         "interviewer": next_resp,
         "candidate": ""
     })
 
+    # Voice the new question in the background; the text is shown right away
+    schedule_turn_audio(len(st.session_state.conversation) - 1, next_resp)
+
     # Reset transcription and audio state for the next turn
     st.session_state.pending_transcription = None
+    st.session_state.live_transcription = None
     st.session_state.processed_audio_hash = None
     st.session_state.tts_played_for_turn = -1
     st.rerun()
 
 
+def send_answer_with_spinner(answer_text, reply_slot=None):
+    """Sends an answer behind a spinner, showing upstream errors inline."""
+    with st.spinner(f"Sending to {st.session_state.interviewer_name}..."):
+        try:
+            send_answer(answer_text, reply_slot=reply_slot)
+        except (ValueError, UpstreamUnavailableError) as e:
+            st.error(str(e))
+
+
+def prepare_voice_answer():
+    """
+    Shared set-up of both voice modes: makes sure the STT engine is loaded
+    (the transcription worker shares it; a spinner shows while the startup
+    warm-up is still running) and renders the auto-send toggle.
+    Returns whether auto-send is on.
+    """
+    if warmup_status()["state"] == "loading":
+        with st.spinner("Speech model is still warming up..."):
+            load_stt_engine()
+    else:
+        load_stt_engine()
+
+    # Auto-send toggle: skips the preview step
+    auto_send = st.checkbox(
+        "Auto-send after transcription",
+        value=st.session_state.auto_send_voice
+    )
+    st.session_state.auto_send_voice = auto_send
+    return auto_send
+
+
+def transcription_preview(auto_send, reply_slot=None):
+    """Manual send: shows the pending transcription and a send button (unless auto-send is on)."""
+    if st.session_state.pending_transcription and not auto_send:
+        st.success(f"Transcribed: \"{st.session_state.pending_transcription}\"")
+        if st.button("📤  Send Recording", use_container_width=True):
+            send_answer_with_spinner(st.session_state.pending_transcription, reply_slot=reply_slot)
+
+
 # =============================================================================
 #  PAGE ROUTING - Decides which page to show based on session_state["page"]
 # =============================================================================
@@ -421,6 +740,20 @@ elif st.session_state.page == "interview":
     )
     st.session_state.interviewer_name = interviewer_name
 
+    # Stream toggle: show the interviewer's reply word by word as it arrives
+    st.session_state.stream_replies = st.sidebar.checkbox(
+        "Stream interviewer replies",
+        value=st.session_state.stream_replies
+    )
+
+    # Voice quality: lower bitrates load faster on slow connections
+    profiles = list(TTS_PROFILES)
+    st.session_state.tts_profile = st.sidebar.selectbox(
+        "Voice quality",
+        options=profiles,
+        index=profiles.index(st.session_state.tts_profile)
+    )
+
     # Job description text area
     job_description_text = st.sidebar.text_area(
         "Job Description (paste text)",
@@ -449,9 +782,18 @@ elif st.session_state.page == "interview":
 
     st.sidebar.markdown("")
 
+    # ── Speculative prefetch of the first question ──
+    # Once both materials are present, generate the first question + audio in
+    # the background so clicking Start doesn't wait on Gemini and ElevenLabs.
+    if (PREFETCH_FIRST_QUESTION and job_description_text and resume_text
+            and not st.session_state.started and not st.session_state.feedback):
+        schedule_first_turn_prefetch(
+            job_description_text, resume_text, st.session_state.interviewer_name
+        )
+
     # ── START INTERVIEW BUTTON ───────────────────────────────────────────────
     # Validates inputs, resets session, calls Gemini for the first question,
-    # generates TTS, and starts the interview.
+    # starts its TTS in the background, and starts the interview.
     if st.sidebar.button("🚀  Start Interview", use_container_width=True):
         if not job_description_text or not resume_text:
             st.warning("Please provide BOTH a job description and a resume.")
@@ -465,34 +807,41 @@ elif st.session_state.page == "interview":
                 st.session_state.tts_played_for_turn = -1
                 st.session_state.processed_audio_hash = None
                 st.session_state.pending_transcription = None
+                st.session_state.live_transcription = None
                 st.session_state.show_material = None
+                st.session_state.answer_notes = {}
+                st.session_state.tts_jobs = {}
                 st.session_state.interview_session_id = id(st.session_state)
                 st.session_state.job_description = job_description_text
 
-                # Get the first interview question from Gemini
-                first_question = interview_response(
-                    job_description_text,
-                    resume_text,
-                    [],  # Empty conversation history for the first question
-                    "Start the interview.",
-                    interviewer_name=st.session_state.interviewer_name
+                # Use the prefetched first question + audio when it matches the inputs
+                prefetched = take_prefetched_first_turn(
+                    job_description_text, resume_text, st.session_state.interviewer_name
                 )
-
-                # Generate TTS audio for the first question
-                try:
-                    tts_bytes = speak_text(first_question)
-                    st.session_state.last_tts_audio = tts_bytes
-                except Exception as tts_err:
-                    st.session_state.last_tts_audio = None
-                    st.sidebar.warning(f"Voice unavailable: {tts_err}")
+                audio_job, audio_format = None, None
+                if prefetched:
+                    first_question, audio_job, audio_format = prefetched
+                else:
+                    # Get the first interview question from Gemini
+                    first_question = generate_reply(
+                        job_description_text,
+                        resume_text,
+                        [],  # Empty conversation history for the first question
+                        "Start the interview.",
+                        st.session_state.interviewer_name,
+                        reply_slot=st.empty()
+                    )
 
                 # Add the first turn to conversation history
                 st.session_state.conversation.append({
                     "interviewer": first_question,
                     "candidate": ""
                 })
+
+                # Voice it in the background (or keep the prefetched audio job)
+                schedule_turn_audio(0, first_question, job=audio_job, output_format=audio_format)
                 st.rerun()
-            except ValueError as e:
+            except (ValueError, UpstreamUnavailableError) as e:
                 st.error(str(e))
                 st.session_state.started = False
 
@@ -507,23 +856,21 @@ elif st.session_state.page == "interview":
     )
 
     # ── STOP & GET FEEDBACK BUTTON ───────────────────────────────────────────
-    # Sends the full conversation to Gemini's evaluation prompt and displays
-    # a detailed performance report.
+    # Sends the full conversation (plus the per-answer evaluation notes when
+    # they are all ready) for a detailed performance report.
     if st.sidebar.button("🛑  Stop & Get Feedback", use_container_width=True):
         if st.session_state.conversation:
             try:
                 with st.spinner("Generating your feedback report..."):
-                    feedback_text = interview_feedback(
-                        st.session_state.job_description,
-                        st.session_state.resume_text,
-                        st.session_state.conversation,
-                    )
+                    feedback_text = build_feedback_report()
                 st.session_state.feedback = feedback_text
+                st.session_state.answer_notes = {}
+                st.session_state.tts_jobs = {}
                 st.session_state.started = False
                 st.session_state.last_tts_audio = None
                 st.session_state.show_material = None
                 st.rerun()
-            except ValueError as e:
+            except (ValueError, UpstreamUnavailableError) as e:
                 st.error(str(e))
         else:
             st.sidebar.warning("No interview in progress.")
@@ -735,15 +1082,26 @@ elif st.session_state.page == "interview":
 
         # ── TTS Audio Player ──
         # Plays the interviewer's voice for the latest question.
+        # The audio is synthesized in the background; until it arrives a
+        # small fragment polls for it and then reruns the page once.
         # Only plays once per turn (tracked by tts_played_for_turn).
         current_turn = len(st.session_state.conversation) - 1
-        if st.session_state.last_tts_audio and st.session_state.tts_played_for_turn != current_turn:
-            st.audio(st.session_state.last_tts_audio, format="audio/mp3", autoplay=True)
+        if current_turn in st.session_state.tts_jobs:
+            turn_audio_poller(current_turn)
+        elif st.session_state.last_tts_audio and st.session_state.tts_played_for_turn != current_turn:
+            st.audio(
+                st.session_state.last_tts_audio,
+                format=audio_mime_type(st.session_state.last_tts_format),
+                autoplay=True
+            )
             st.session_state.tts_played_for_turn = current_turn
 
         # ── Chat Bubbles ──
         render_chat(st.session_state.conversation, iname)
 
+        # Placeholder for the next interviewer reply while it streams in
+        live_reply_slot = st.empty()
+
         # ── Visual separator ──
         st.markdown("""
         <div style="
@@ -754,10 +1112,11 @@ elif st.session_state.page == "interview":
         """, unsafe_allow_html=True)
 
         # ── ANSWER INPUT AREA ────────────────────────────────────────────────
-        # Two modes: "Type" (text input) or "Transcribe (voice)" (Whisper STT)
+        # Three modes: "Type" (text input), "Transcribe (voice)" (record, then
+        # speech-to-text) or "Live voice" (transcribed segment by segment while speaking)
         answer_format = st.selectbox(
             "How do you want to answer?",
-            options=["Type", "Transcribe (voice)"],
+            options=["Type", "Transcribe (voice)", "Live voice"],
             label_visibility="collapsed"
         )
 
@@ -776,27 +1135,82 @@ elif st.session_state.page == "interview":
                 if not user_answer:
                     st.warning("Please type an answer first.")
                 else:
-                    with st.spinner(f"Sending to {iname}..."):
+                    send_answer_with_spinner(user_answer, reply_slot=live_reply_slot)
+
+        elif answer_format == "Live voice":
+            # ── Live voice mode (incremental transcription) ──
+            # 1. The live_recorder component streams numbered audio segments
+            #    (cut at pauses) while the candidate speaks
+            # 2. Each new segment is queued for transcription right away
+            # 3. The acknowledged seq goes back to the component, which drops
+            #    those segments and resends the rest
+            # 4. On stop, only the last segment is left to decode
+
+            auto_send = prepare_voice_answer()
+
+            live = st.session_state.live_transcription
+            turn_idx = len(st.session_state.conversation)
+            value = live_recorder(
+                acked=live.acked if live else -1,
+                recording=live.recording_id if live else None,
+                segment_seconds=LIVE_SEGMENT_SECONDS,
+                key=f"live_rec_{st.session_state.interview_session_id}_{turn_idx}",
+                default=None
+            )
+
+            if value and value.get("recording"):
+                # A new recording (or the first one this turn) starts a fresh transcript
+                if live is None or live.recording_id != value["recording"]:
+                    live = LiveTranscription(value["recording"])
+                    st.session_state.live_transcription = live
+                    st.session_state.pending_transcription = None
+
+                if not live.finished:
+                    try:
+                        for segment in value.get("segments", []):
+                            live.add_segment(segment["seq"], segment["data"])
+                        if value.get("done"):
+                            live.mark_stopped()
+                    except Exception as e:
+                        live.finished = True  # don't retry this recording on every rerun
+                        st.error(f"Error processing audio: {e}")
+
+                if not live.finished:
+                    if value.get("done") and live.acked == value["total"] - 1:
                         try:
-                            send_answer(user_answer)
-                        except ValueError as e:
-                            st.error(str(e))
+                            with st.spinner("Finishing your transcript..."):
+                                transcription = live.finish()
+                        except Exception as e:
+                            live.finished = True  # don't retry this recording on every rerun
+                            st.error(f"Error processing audio: {e}")
+                            transcription = ""
+
+                        if transcription:
+                            st.session_state.pending_transcription = transcription
+                            if auto_send:
+                                send_answer_with_spinner(transcription, reply_slot=live_reply_slot)
+                            else:
+                                # Rerun once so the recorder sees the final acknowledgement
+                                st.rerun()
+                        else:
+                            st.warning("Could not transcribe audio. Please try again.")
+                    else:
+                        heard = live.partial_text()
+                        if heard:
+                            st.caption(f"Heard so far: {heard}")
+
+            # ── Manual send: show transcription preview + send button ──
+            transcription_preview(auto_send, reply_slot=live_reply_slot)
 
         else:
-            # ── Voice answer mode (Whisper transcription) ──
-            # 1. Load Whisper model (cached)
+            # ── Voice answer mode (STT engine transcription) ──
+            # 1. Load the STT engine (cached)
             # 2. Record audio via st.audio_input
-            # 3. Transcribe with Whisper
+            # 3. Transcribe with the engine
             # 4. Optionally auto-send, or show preview + manual send button
 
-            processor, model = load_whisper()
-
-            # Auto-send toggle: skips the preview step
-            auto_send = st.checkbox(
-                "Auto-send after transcription",
-                value=st.session_state.auto_send_voice
-            )
-            st.session_state.auto_send_voice = auto_send
+            # Make sure the model is loaded and show the auto-send toggle
+            auto_send = prepare_voice_answer()
 
             # Audio recorder widget (dynamic key resets widget between turns)
             turn_idx = len(st.session_state.conversation)
@@ -812,29 +1226,11 @@ elif st.session_state.page == "interview":
                     st.session_state.processed_audio_hash = audio_hash
 
                     with st.spinner("Transcribing your recording..."):
-                        tmp_path = None
                         try:
-                            # Save audio to a temp WAV file for processing
-                            tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                            tmp_path = tmp.name
-                            tmp.write(raw_bytes)
-                            tmp.close()
-
-                            # Read audio and convert to mono 16kHz (Whisper's expected format)
-                            waveform, sample_rate = sf.read(tmp_path)
-                            if len(waveform.shape) > 1:
-                                waveform = waveform.mean(axis=1)  # Stereo → mono
-                            waveform = librosa.resample(
-                                waveform, orig_sr=sample_rate, target_sr=16000
-                            )
-
-                            # Run Whisper inference
-                            inputs = processor(waveform, sampling_rate=16000, return_tensors="pt")
-                            with torch.no_grad():
-                                predicted_ids = model.generate(inputs.input_features)
-                            transcription = processor.batch_decode(
-                                predicted_ids, skip_special_tokens=True
-                            )[0]
+                            # Decode in memory to mono 16kHz float32 and run the STT engine
+                            # (shared worker: recordings from concurrent sessions share one
+                            # batch; answers over 30 s are windowed; repeats hit the cache)
+                            transcription = transcribe_recording(raw_bytes)
 
                         except Exception as e:
                             # On error, reset hash so user can retry
@@ -842,20 +1238,15 @@ elif st.session_state.page == "interview":
                             st.session_state.pending_transcription = None
                             st.error(f"Error processing audio: {e}")
                             transcription = ""
-                        finally:
-                            # Always clean up the temp file
-                            if tmp_path and os.path.exists(tmp_path):
-                                os.unlink(tmp_path)
 
                     if transcription.strip():
                         st.session_state.pending_transcription = transcription.strip()
                         if auto_send:
                             # Auto-send: immediately send without preview
-                            with st.spinner(f"Sending to {iname}..."):
-                                try:
-                                    send_answer(st.session_state.pending_transcription)
-                                except ValueError as e:
-                                    st.error(str(e))
+                            send_answer_with_spinner(
+                                st.session_state.pending_transcription,
+                                reply_slot=live_reply_slot
+                            )
                     else:
                         # Empty transcription - reset hash so user can re-record
                         st.session_state.processed_audio_hash = None
@@ -863,11 +1254,4 @@ elif st.session_state.page == "interview":
                             st.warning("Could not transcribe audio. Please try again.")
 
             # ── Manual send: show transcription preview + send button ──
-            if st.session_state.pending_transcription and not auto_send:
-                st.success(f"Transcribed: \"{st.session_state.pending_transcription}\"")
-                if st.button("📤  Send Recording", use_container_width=True):
-                    with st.spinner(f"Sending to {iname}..."):
-                        try:
-                            send_answer(st.session_state.pending_transcription)
-                        except ValueError as e:
-                            st.error(str(e))
+            transcription_preview(auto_send, reply_slot=live_reply_slot)
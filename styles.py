@@ -369,6 +369,46 @@ window.scrollTo(0, document.body.scrollHeight);
 </html>
 """
 
+STREAMING_BUBBLE_HTML = """
+<div style="
+    max-width: 78%;
+    padding: 14px 18px;
+    border-radius: 18px;
+    border-bottom-left-radius: 4px;
+    line-height: 1.6;
+    font-size: 0.92rem;
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+    background: linear-gradient(135deg, #F8FAFC 0%, #F1F5F9 100%);
+    border: 1px solid #E2E8F0;
+    color: #1E293B;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.06);
+    margin: 0 auto 1rem 8px;
+">
+    <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 6px;">
+        <div style="
+            width: 24px; height: 24px;
+            border-radius: 50%;
+            display: flex; align-items: center; justify-content: center;
+            font-size: 0.7rem;
+            font-weight: 700;
+            background: linear-gradient(135deg, #06B6D4, #0891B2);
+            color: white;
+        ">{initial}</div>
+        <div style="font-weight: 600; font-size: 0.78rem; opacity: 0.75; color: #475569;">{name}</div>
+        <span style="
+            background: rgba(79, 70, 229, 0.1);
+            color: #4F46E5;
+            font-size: 0.65rem;
+            font-weight: 700;
+            padding: 2px 7px;
+            border-radius: 10px;
+            margin-left: auto;
+        ">Q{q_num}</span>
+    </div>
+    {message}
+</div>
+"""
+
 HERO_HTML = """
 <div style="
     text-align: center;
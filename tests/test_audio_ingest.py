@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE, trim_silence
+
+
+def noise(seconds: float, level: float = 0.1) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * TARGET_SAMPLE_RATE)) * level).astype(np.float32)
+
+
+@pytest.mark.parametrize("seconds", [0.05, 0.2, 0.4, 0.44])
+def test_clip_shorter_than_padding_is_kept_whole(seconds):
+    waveform = noise(seconds)
+    assert np.array_equal(trim_silence(waveform), waveform)
+
+
+def test_silence_around_speech_is_trimmed():
+    silence = np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32)
+    waveform = np.concatenate([silence, noise(1.0), silence])
+    trimmed = trim_silence(waveform)
+    # One second of speech plus at most the padding on each side
+    assert TARGET_SAMPLE_RATE <= len(trimmed) <= 1.5 * TARGET_SAMPLE_RATE
+
+
+def test_silent_clip_is_unchanged():
+    waveform = np.zeros(TARGET_SAMPLE_RATE // 5, dtype=np.float32)
+    assert np.array_equal(trim_silence(waveform), waveform)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from backend.audio_ingest import TARGET_SAMPLE_RATE
+from backend.stt_chunking import (
+    MAX_SINGLE_PASS_SECONDS,
+    OVERLAP_SECONDS,
+    WINDOW_SECONDS,
+    split_windows,
+    stitch_transcripts,
+    window_bounds,
+)
+
+# Speaking rate of the simulated answers
+SECONDS_PER_WORD = 0.4
+
+WORDS = [f"w{i}" for i in range(40)]
+
+
+def simulated_answer(seconds: float):
+    """
+    Window transcripts of an answer of `seconds` at SECONDS_PER_WORD, cut
+    exactly as split_windows would cut the audio. Each window hears the
+    words whose midpoint falls inside it. Returns (transcripts, full text).
+    """
+    words = [f"w{i}" for i in range(int(seconds / SECONDS_PER_WORD))]
+    texts = []
+    for start, end in window_bounds(int(seconds * TARGET_SAMPLE_RATE)):
+        heard = [w for i, w in enumerate(words)
+                 if start <= (i + 0.5) * SECONDS_PER_WORD * TARGET_SAMPLE_RATE < end]
+        texts.append(" ".join(heard))
+    return texts, " ".join(words)
+
+
+@pytest.mark.parametrize("seconds", [29, 40, 60, 180])
+def test_simulated_answer_stitches_back(seconds):
+    texts, expected = simulated_answer(seconds)
+    assert stitch_transcripts(texts) == expected
+
+
+@pytest.mark.parametrize("texts, expected", [
+    pytest.param([" ".join(WORDS[:16]), " ".join(WORDS[12:30]), " ".join(WORDS[26:])], " ".join(WORDS),
+                 id="clean overlap"),
+    pytest.param(["Well, w1 w2 w3 w4.", "W3, w4 w5 w6."], "Well, w1 w2 w3 w4. w5 w6.",
+                 id="punctuation and case"),
+    pytest.param([" ".join(WORDS[:15]), " ".join(["w10", "w11", "x12", "w13", "w14"] + WORDS[15:25])],
+                 " ".join(WORDS[:25]), id="one misheard word"),
+    pytest.param(["w0 w1 w2", "w3 w4 w5"], "w0 w1 w2 w3 w4 w5", id="no overlap"),
+    pytest.param(["w0 w1 w2", "", "w1 w2 w3"], "w0 w1 w2 w3", id="empty window"),
+])
+def test_stitch_transcripts(texts, expected):
+    assert stitch_transcripts(texts) == expected
+
+
+@pytest.mark.parametrize("seconds", [1, 29, MAX_SINGLE_PASS_SECONDS])
+def test_single_pass_recording_is_one_window(seconds):
+    waveform = np.zeros(int(seconds * TARGET_SAMPLE_RATE), dtype=np.float32)
+    assert window_bounds(len(waveform)) == [(0, len(waveform))]
+    assert split_windows(waveform)[0] is waveform
+
+
+@pytest.mark.parametrize("seconds", [31, 40, 53, 60, 180.5])
+def test_windows_cover_the_recording_with_exact_overlaps(seconds):
+    samples = int(seconds * TARGET_SAMPLE_RATE)
+    bounds = window_bounds(samples)
+    window = int(WINDOW_SECONDS * TARGET_SAMPLE_RATE)
+    overlap = int(OVERLAP_SECONDS * TARGET_SAMPLE_RATE)
+    assert len(bounds) > 1
+    assert bounds[0][0] == 0 and bounds[-1][1] == samples
+    assert all(end - start <= window for start, end in bounds)
+    for (_, previous_end), (start, _) in zip(bounds, bounds[1:]):
+        assert previous_end - start == overlap
+    # The last window adds audio beyond the overlap
+    assert bounds[-1][1] - bounds[-1][0] > overlap